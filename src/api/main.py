@@ -27,6 +27,7 @@ async def lifespan(app: FastAPI):
     db = Database()
     await db.connect()
     yield
+    await github.aclose()
     await db.close()
 
 
@@ -1,5 +1,6 @@
 """Core infrastructure packages."""
 
+from .cache import TTLCache
 from .config import Config, settings
 from .database import Database, get_db
 from .logging_ import LoggingMixin, get_logger
@@ -15,6 +16,7 @@ from .monitoring import (
 )
 
 __all__ = [
+    "TTLCache",
     "Config",
     "settings",
     "Database",
@@ -33,6 +33,7 @@ class GitHubConfig:
     rate_limit_wait: float = 1.0
     max_retries: int = 3
     timeout: int = 30
+    cache_ttl: int = 300
 
 
 @dataclass
@@ -73,6 +74,8 @@ class TaskConfig:
     queue_size: int = 10
     timeout: int = 300
     max_retries: int = 2
+    max_history: int = 10000
+    keep_history: bool = True
 
 
 @dataclass
@@ -1,6 +1,7 @@
 """Database layer using SQLAlchemy with async support."""
 
 import os
+import sqlite3
 from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Any, AsyncGenerator, Dict, List, Optional
@@ -14,8 +15,10 @@ from sqlalchemy import (
     String,
     Text,
     create_engine,
+    event,
     select,
 )
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, relationship, sessionmaker
 
@@ -26,6 +29,27 @@ logger = get_logger(__name__)
 
 config = get_config()
 
+# INSERT ... RETURNING needs SQLite 3.35+.
+SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Applied to every new connection: WAL journaling, fewer fsyncs, a 64 MB page
+# cache and a 256 MB memory map.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+)
+
+
+def _apply_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    """Tune a new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
 
 class Base(DeclarativeBase):
     """Base class for all database models."""
@@ -113,6 +137,33 @@ class PRStatus(Base):
     closed_at = Column(DateTime)
 
 
+class RepoStatusCache(Base):
+    """Last parsed REPO_STATUS.md per repository, keyed by content hash."""
+    __tablename__ = "repo_status_cache"
+
+    full_name = Column(String(500), primary_key=True)
+    content_hash = Column(String(32), nullable=False)
+    parsed_json = Column(Text, nullable=False)
+    etag = Column(String(200))
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+def _build_repository_upsert():
+    """Build the repository upsert once so its compiled SQL is cached and reused."""
+    stmt = sqlite_insert(Repository)
+    return stmt.on_conflict_do_update(
+        index_elements=[Repository.full_name],
+        set_={
+            column.name: stmt.excluded[column.name]
+            for column in Repository.__table__.columns
+            if column.name not in ("id", "full_name", "created_at_db")
+        },
+    ).returning(Repository.full_name, Repository.id)
+
+
+UPSERT_REPOSITORY = _build_repository_upsert()
+
+
 class Database:
     """Database connection manager."""
 
@@ -134,6 +185,7 @@ class Database:
             echo=config.database.echo,
             pool_pre_ping=True,
         )
+        event.listen(self.async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
 
         self.async_session = async_sessionmaker(
             self.async_engine,
@@ -215,22 +267,92 @@ class Database:
                 logger.warning(f"Could not find repository_id for review, skipping database save")
                 return None
 
-            review = ReviewSession(
-                repository_id=repo_id,
-                status=review_result.get("status", "completed"),
-                overall_score=review_result.get("overall_score"),
-                quality_score=review_result.get("quality_score"),
-                documentation_score=review_result.get("documentation_score"),
-                structure_score=review_result.get("structure_score"),
-                testing_score=review_result.get("testing_score"),
-                summary=review_result.get("summary"),
-                stuck_areas=review_result.get("stuck_areas"),
-                next_steps=review_result.get("next_steps"),
-                completed_at=datetime.utcnow(),
-            )
+            review = self._build_review_session(repo_id, review_result)
             session.add(review)
             return review
 
+    @staticmethod
+    def _build_review_session(
+        repo_id: int,
+        review_result: Dict[str, Any],
+        completed_at: Optional[datetime] = None,
+    ) -> ReviewSession:
+        """Build a review session row from a review result."""
+        return ReviewSession(
+            repository_id=repo_id,
+            status=review_result.get("status", "completed"),
+            overall_score=review_result.get("overall_score"),
+            quality_score=review_result.get("quality_score"),
+            documentation_score=review_result.get("documentation_score"),
+            structure_score=review_result.get("structure_score"),
+            testing_score=review_result.get("testing_score"),
+            summary=review_result.get("summary"),
+            stuck_areas=review_result.get("stuck_areas"),
+            next_steps=review_result.get("next_steps"),
+            completed_at=completed_at or datetime.utcnow(),
+        )
+
+    async def save_repositories_with_reviews(
+        self,
+        repos: List[Dict[str, Any]],
+        review_results: Dict[str, Dict[str, Any]],
+        completed_at: Optional[datetime] = None,
+    ) -> Dict[str, int]:
+        """Upsert repositories and add review sessions (keyed by full name) in one transaction.
+
+        Every session gets the same completed_at, defaulting to now.
+        """
+        completed_at = completed_at or datetime.utcnow()
+        async with self.session() as session:
+            if SQLITE_HAS_RETURNING:
+                repo_ids = await self._upsert_repositories(session, repos)
+            else:
+                repo_ids = await self._merge_repositories(session, repos)
+
+            for full_name, review_result in review_results.items():
+                session.add(
+                    self._build_review_session(
+                        repo_ids[full_name], review_result, completed_at=completed_at
+                    )
+                )
+
+            return repo_ids
+
+    @staticmethod
+    async def _upsert_repositories(
+        session: AsyncSession, repos: List[Dict[str, Any]]
+    ) -> Dict[str, int]:
+        """Upsert repositories with INSERT ... ON CONFLICT ... RETURNING id.
+
+        Every repository dict must carry all columns, as each conflict overwrites them.
+        """
+        result = await session.execute(UPSERT_REPOSITORY, repos)
+        return dict(result.all())
+
+    @staticmethod
+    async def _merge_repositories(
+        session: AsyncSession, repos: List[Dict[str, Any]]
+    ) -> Dict[str, int]:
+        """Upsert repositories through the ORM, for SQLite without RETURNING."""
+        result = await session.execute(
+            select(Repository).where(Repository.full_name.in_([r["full_name"] for r in repos]))
+        )
+        by_name = {repo.full_name: repo for repo in result.scalars()}
+
+        for repo_data in repos:
+            repo = by_name.get(repo_data["full_name"])
+            if repo:
+                for key, value in repo_data.items():
+                    if hasattr(repo, key) and key != "id":
+                        setattr(repo, key, value)
+            else:
+                repo = by_name[repo_data["full_name"]] = Repository(**repo_data)
+                session.add(repo)
+
+        # Assign ids to new repositories before referencing them.
+        await session.flush()
+        return {full_name: repo.id for full_name, repo in by_name.items()}
+
     async def get_repository(self, full_name: str) -> Optional[Repository]:
         """Get repository by full name."""
         async with self.session() as session:
@@ -252,6 +374,23 @@ class Database:
             result = await session.execute(query)
             return list(result.scalars().all())
 
+    async def get_repo_status_cache(self, full_name: str) -> Optional[RepoStatusCache]:
+        """Get the cached status file parse for a repository."""
+        async with self.session() as session:
+            result = await session.execute(
+                select(RepoStatusCache).where(RepoStatusCache.full_name == full_name)
+            )
+            return result.scalar_one_or_none()
+
+    async def save_repo_status_cache(
+        self, entries: List[Dict[str, Any]], updated_at: Optional[datetime] = None
+    ) -> None:
+        """Store status file parses and their ETags in one transaction."""
+        updated_at = updated_at or datetime.utcnow()
+        async with self.session() as session:
+            for entry in entries:
+                await session.merge(RepoStatusCache(updated_at=updated_at, **entry))
+
     async def create_task(self, task_data: Dict[str, Any]) -> Task:
         """Create a new task."""
         async with self.session() as session:
@@ -2,9 +2,12 @@
 
 import logging
 import os
+import queue
 import sys
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
 import structlog
 from structlog.stdlib import add_log_level, filter_by_level
@@ -33,6 +36,7 @@ def setup_logging(
     processors = [
         filter_by_level,
         add_log_level,
+        structlog.stdlib.PositionalArgumentsFormatter(),
         structlog.processors.TimeStamper(fmt="iso"),
         structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
@@ -60,6 +64,22 @@ def setup_logging(
     )
 
 
+@contextmanager
+def queued_logging() -> Iterator[None]:
+    """Hand log records to a background thread that writes them, for the duration of the block."""
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handlers = logging.root.handlers[:]
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+
+    logging.root.handlers = [QueueHandler(log_queue)]
+    listener.start()
+    try:
+        yield
+    finally:
+        listener.stop()
+        logging.root.handlers = handlers
+
+
 class LoggingMixin:
     """Mixin class for adding logging to components."""
 
@@ -1,6 +1,6 @@
 """GitHub integration package."""
 
-from .client import GitHubClient
+from .client import GitHubClient, GitHubThrottle
 from .types import Repository, FileContent, RateLimitInfo
 
-__all__ = ["GitHubClient", "Repository", "FileContent", "RateLimitInfo"]
+__all__ = ["GitHubClient", "GitHubThrottle", "Repository", "FileContent", "RateLimitInfo"]
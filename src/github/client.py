@@ -1,10 +1,16 @@
 """GitHub API client with rate limiting and retry logic."""
 
+import asyncio
+import base64
 import os
+import threading
 import time
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import httpx
 
 from github import Github
 from github.Repository import Repository as GithubRepo
@@ -15,6 +21,7 @@ from tenacity import (
     wait_exponential,
 )
 
+from ..core.cache import TTLCache
 from ..core.config import get_config
 from ..core.logging_ import get_logger
 
@@ -40,6 +47,7 @@ class FileContent:
     size: int
     sha: str
     encoding: str
+    etag: Optional[str] = None
 
 
 @dataclass
@@ -102,6 +110,73 @@ class Repository:
         }
 
 
+class GitHubThrottle:
+    """Adaptive limiter that pauses callers when GitHub quota runs low."""
+
+    def __init__(self, threshold: int = 10, max_wait: float = 60):
+        self.threshold = threshold
+        self.max_wait = max_wait
+        self.remaining: Optional[int] = None
+        self.reset_ts: float = 0.0
+        self.retry_after_ts: float = 0.0
+
+    def update(
+        self,
+        remaining: Optional[int] = None,
+        reset_at: Optional[datetime] = None,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        """Record quota information from the latest GitHub response."""
+        if remaining is not None:
+            self.remaining = remaining
+
+        if reset_at is not None:
+            if reset_at.tzinfo is None:
+                reset_at = reset_at.replace(tzinfo=timezone.utc)
+            self.reset_ts = reset_at.timestamp()
+
+        if retry_after:
+            self.retry_after_ts = max(self.retry_after_ts, time.time() + retry_after)
+
+    def update_from_headers(self, headers: Optional[Dict[str, Any]]) -> None:
+        """Record X-RateLimit-* and Retry-After headers."""
+        if not headers:
+            return
+
+        headers = {k.lower(): v for k, v in headers.items()}
+        try:
+            if "x-ratelimit-remaining" in headers:
+                self.remaining = int(headers["x-ratelimit-remaining"])
+            if "x-ratelimit-reset" in headers:
+                self.reset_ts = float(headers["x-ratelimit-reset"])
+            if "retry-after" in headers:
+                self.update(retry_after=float(headers["retry-after"]))
+        except (TypeError, ValueError):
+            logger.debug(f"Ignoring malformed rate limit headers: {headers}")
+
+    def _wait_time(self) -> float:
+        now = time.time()
+        wait = self.retry_after_ts - now
+
+        if self.remaining is not None and self.remaining <= self.threshold:
+            wait = max(wait, self.reset_ts - now)
+
+        return wait
+
+    async def acquire(self) -> None:
+        """Wait until it is safe to issue more GitHub requests."""
+        while True:
+            wait = self._wait_time()
+            if wait <= 0:
+                return
+
+            logger.warning(f"GitHub quota low ({self.remaining}). Waiting {wait:.1f}s")
+            await asyncio.sleep(min(wait + 1, self.max_wait))
+
+            if self.remaining is not None and time.time() >= self.reset_ts:
+                self.remaining = None
+
+
 class GitHubClient:
     """GitHub API client with rate limiting and retry logic."""
 
@@ -115,9 +190,27 @@ class GitHubClient:
             timeout=config.github.timeout,
         )
         self._rate_limit_info: Optional[RateLimitInfo] = None
-
-    def _handle_rate_limit(self) -> None:
-        """Handle rate limiting by waiting if necessary."""
+        self.throttle = GitHubThrottle()
+        # PyGithub repository objects, shared by the threads that fetch file contents.
+        self._repo_objects = TTLCache(maxsize=256, ttl=config.github.cache_ttl)
+        self._repo_objects_lock = threading.Lock()
+        # Shared HTTP client for the raw REST calls PyGithub can't make; created lazily.
+        self._http: Optional[httpx.AsyncClient] = None
+
+    def _get_http(self) -> httpx.AsyncClient:
+        """Get the shared HTTP client, creating it on first use."""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(timeout=config.github.timeout)
+        return self._http
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP client."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def _refresh_rate_limit(self) -> Optional[RateLimitInfo]:
+        """Fetch the current quota and record it on the client and the throttle."""
         try:
             rate_limit = self.client.get_rate_limit()
             # Handle different PyGithub versions
@@ -128,7 +221,7 @@ class GitHubClient:
             else:
                 # Fallback: skip rate limit handling if API changed
                 logger.debug("Could not get rate limit info, skipping")
-                return
+                return None
 
             self._rate_limit_info = RateLimitInfo(
                 remaining=core.remaining,
@@ -136,14 +229,38 @@ class GitHubClient:
                 reset_at=core.reset,
                 used=getattr(core, 'used', 0),
             )
-
-            if core.remaining < 10:
-                wait_time = (core.reset - datetime.utcnow()).total_seconds()
-                if wait_time > 0:
-                    logger.warning(f"Rate limit low ({core.remaining}). Waiting {wait_time:.1f}s")
-                    time.sleep(min(wait_time + 1, 60))
+            self.throttle.update(remaining=core.remaining, reset_at=core.reset)
+            return self._rate_limit_info
         except Exception as e:
             logger.debug(f"Rate limit check failed: {e}")
+            return None
+
+    def _handle_rate_limit(self) -> None:
+        """Handle rate limiting by waiting if necessary."""
+        info = self._refresh_rate_limit()
+        if info is not None and info.remaining < 10:
+            # The throttle holds the reset as a UTC timestamp, whether or not
+            # PyGithub returned an aware datetime.
+            wait_time = self.throttle.reset_ts - time.time()
+            if wait_time > 0:
+                logger.warning(f"Rate limit low ({info.remaining}). Waiting {wait_time:.1f}s")
+                time.sleep(min(wait_time + 1, 60))
+
+    async def _wait_for_rate_limit(self) -> None:
+        """Async counterpart of _handle_rate_limit that never blocks the event loop."""
+        await asyncio.to_thread(self._refresh_rate_limit)
+        await self.throttle.acquire()
+
+    def _get_github_repo(self, full_name: str) -> GithubRepo:
+        """Get a PyGithub repository, probing the rate limit and fetching it only on a miss."""
+        with self._repo_objects_lock:
+            repo = self._repo_objects.get(full_name)
+        if repo is None:
+            self._handle_rate_limit()
+            repo = self.client.get_repo(full_name)
+            with self._repo_objects_lock:
+                self._repo_objects.set(full_name, repo)
+        return repo
 
     def _retry_strategy(self) -> Retrying:
         """Create retry strategy for API calls."""
@@ -156,27 +273,41 @@ class GitHubClient:
 
     async def list_all_repositories(self, include_forks: bool = False) -> List[Repository]:
         """List all repositories for the authenticated user."""
-        repositories = []
-        user = self.client.get_user()
-
-        self._handle_rate_limit()
-
-        for repo in user.get_repos(type="all"):
-            self._handle_rate_limit()
-
-            if repo.archived and not include_forks:
-                continue
-
-            if repo.fork and not include_forks:
-                continue
-
-            repositories.append(Repository.from_github(repo))
+        repositories = [repo async for repo in self.iter_all_repositories(include_forks)]
 
         logger.info(f"Found {len(repositories)} repositories")
         return repositories
 
+    async def iter_all_repositories(
+        self, include_forks: bool = False
+    ) -> AsyncIterator[Repository]:
+        """Yield repositories for the authenticated user as each page arrives."""
+        await self._wait_for_rate_limit()
+        # Both calls are lazy; no request is made until a page is fetched.
+        paginated = self.client.get_user().get_repos(type="all")
+
+        page = 0
+        while True:
+            await self._wait_for_rate_limit()
+            # PyGithub pagination blocks, so pages are fetched off the event loop.
+            batch = await asyncio.to_thread(paginated.get_page, page)
+            if not batch:
+                break
+
+            for repo in batch:
+                if (repo.archived or repo.fork) and not include_forks:
+                    continue
+                yield Repository.from_github(repo)
+
+            page += 1
+
     async def get_repository(self, full_name: str) -> Optional[Repository]:
         """Get a specific repository by full name."""
+        # PyGithub blocks, so run it in a thread to let concurrent lookups overlap.
+        return await asyncio.to_thread(self._get_repository_sync, full_name)
+
+    def _get_repository_sync(self, full_name: str) -> Optional[Repository]:
+        """Blocking body of get_repository."""
         try:
             self._handle_rate_limit()
             repo = self.client.get_repo(full_name)
@@ -189,9 +320,13 @@ class GitHubClient:
         self, full_name: str, path: str
     ) -> Optional[FileContent]:
         """Get the content of a file from a repository."""
+        # PyGithub blocks, so run it in a thread to let concurrent fetches overlap.
+        return await asyncio.to_thread(self._get_file_content_sync, full_name, path)
+
+    def _get_file_content_sync(self, full_name: str, path: str) -> Optional[FileContent]:
+        """Blocking body of get_file_content."""
         try:
-            self._handle_rate_limit()
-            repo = self.client.get_repo(full_name)
+            repo = self._get_github_repo(full_name)
             file_content = repo.get_contents(path)
 
             if isinstance(file_content, list):
@@ -203,15 +338,134 @@ class GitHubClient:
                 size=file_content.size,
                 sha=file_content.sha,
                 encoding=file_content.encoding,
+                etag=getattr(file_content, "etag", None),
             )
         except Exception as e:
+            self.throttle.update_from_headers(getattr(e, "headers", None))
             logger.debug(f"Failed to get file {path} from {full_name}: {e}")
             return None
 
+    async def get_file_content_conditional(
+        self, full_name: str, path: str, etag: Optional[str] = None
+    ) -> Tuple[int, Optional[FileContent]]:
+        """Get a file, sending If-None-Match so unchanged files return 304 with no body.
+
+        Returns the HTTP status and the file (None unless the status is 200).
+        """
+        headers = {
+            "Authorization": f"Bearer {self.token}",
+            "Accept": "application/vnd.github+json",
+        }
+        if etag:
+            headers["If-None-Match"] = etag
+
+        url = f"{config.github.api_url}/repos/{full_name}/contents/{quote(path)}"
+
+        try:
+            response = await self._get_http().get(url, headers=headers)
+        except Exception as e:
+            logger.debug(f"Failed to get file {path} from {full_name}: {e}")
+            return 0, None
+
+        self.throttle.update_from_headers(response.headers)
+
+        if response.status_code != 200:
+            return response.status_code, None
+
+        data = response.json()
+        if isinstance(data, list) or data.get("type") != "file":
+            return response.status_code, None
+
+        try:
+            content = base64.b64decode(data.get("content", "")).decode("utf-8")
+        except (ValueError, UnicodeDecodeError) as e:
+            logger.debug(f"Failed to decode {path} from {full_name}: {e}")
+            return response.status_code, None
+
+        return response.status_code, FileContent(
+            path=data["path"],
+            content=content,
+            size=data["size"],
+            sha=data["sha"],
+            encoding=data.get("encoding", "base64"),
+            etag=response.headers.get("etag"),
+        )
+
+    async def get_file_content_prefix(
+        self, full_name: str, path: str, n_chars: int
+    ) -> Optional[str]:
+        """Get the first n_chars characters of a file using an HTTP Range request.
+
+        A UTF-8 character is at most 4 bytes, so 4 * n_chars bytes always cover
+        n_chars characters; the text is decoded first and then truncated.
+        """
+        headers = {
+            "Authorization": f"Bearer {self.token}",
+            "Accept": "application/vnd.github.raw",
+            "Range": f"bytes=0-{4 * n_chars - 1}",
+        }
+        url = f"{config.github.api_url}/repos/{full_name}/contents/{quote(path)}"
+
+        try:
+            response = await self._get_http().get(
+                url, headers=headers, follow_redirects=True
+            )
+        except Exception as e:
+            logger.debug(f"Failed to get file {path} from {full_name}: {e}")
+            return None
+
+        self.throttle.update_from_headers(response.headers)
+
+        # Servers that ignore Range answer 200 with the whole file.
+        if response.status_code not in (200, 206):
+            return None
+
+        # The range may end inside a multi-byte character; drop that partial tail.
+        return response.content.decode("utf-8", errors="ignore")[:n_chars]
+
+    async def get_blob(
+        self, full_name: str, sha: str, path: str = ""
+    ) -> Optional[FileContent]:
+        """Get text file content by blob SHA using the Git Data API."""
+        # PyGithub blocks, so run it in a thread to let concurrent fetches overlap.
+        return await asyncio.to_thread(self._get_blob_sync, full_name, sha, path)
+
+    def _get_blob_sync(self, full_name: str, sha: str, path: str) -> Optional[FileContent]:
+        """Blocking body of get_blob."""
+        try:
+            # With the repository cached this is a single REST call per blob.
+            repo = self._get_github_repo(full_name)
+            blob = repo.get_git_blob(sha)
+
+            if blob.encoding == "base64":
+                raw = base64.b64decode(blob.content)
+            else:
+                raw = blob.content.encode("utf-8")
+
+            # Same heuristic git uses: a NUL byte near the start means binary.
+            if b"\0" in raw[:8000]:
+                return None
+
+            return FileContent(
+                path=path,
+                content=raw.decode("utf-8"),
+                size=blob.size,
+                sha=blob.sha,
+                encoding=blob.encoding,
+            )
+        except Exception as e:
+            self.throttle.update_from_headers(getattr(e, "headers", None))
+            logger.debug(f"Failed to get blob {sha} ({path}) from {full_name}: {e}")
+            return None
+
     async def list_directory(
         self, full_name: str, path: str = ""
     ) -> List[Dict[str, Any]]:
         """List contents of a directory in a repository."""
+        return await asyncio.to_thread(self._list_directory_sync, full_name, path)
+
+    def _list_directory_sync(self, full_name: str, path: str) -> List[Dict[str, Any]]:
+        """Blocking body of list_directory."""
         contents = []
         try:
             self._handle_rate_limit()
@@ -228,6 +482,7 @@ class GitHubClient:
                 })
 
         except Exception as e:
+            self.throttle.update_from_headers(getattr(e, "headers", None))
             logger.error(f"Failed to list directory {path} in {full_name}: {e}")
 
         return contents
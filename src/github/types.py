@@ -22,6 +22,7 @@ class FileContent:
     size: int
     sha: str
     encoding: str
+    etag: Optional[str] = None
 
 
 @dataclass
@@ -32,6 +32,17 @@ def check_environment() -> bool:
     return True
 
 
+def install_event_loop() -> None:
+    """Use uvloop for the asyncio event loop when it is installed."""
+    try:
+        import uvloop
+    except ImportError:
+        return
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    logger.info("Using uvloop event loop")
+
+
 async def run_review_all() -> None:
     """Run review on all repositories."""
     from .github import GitHubClient
@@ -73,6 +84,7 @@ async def run_review_all() -> None:
             logger.error(f"Failed to review {repo.full_name}: {e}")
             continue
 
+    await github.aclose()
     await db.close()
     logger.info("Review complete")
 
@@ -110,6 +122,7 @@ def main() -> int:
         return 1
 
     config = get_config()
+    install_event_loop()
 
     if len(sys.argv) > 1:
         command = sys.argv[1].lower()
@@ -1,15 +1,18 @@
 """Review orchestrator for managing repository reviews."""
 
 import asyncio
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 
+from ..core.cache import TTLCache
 from ..core.config import get_config
 from ..core.database import Database
 from ..core.logging_ import get_logger
-from ..github import GitHubClient, Repository
+from ..github import FileContent, GitHubClient, Repository
 from ..llm import LLMClient
 from .analyzer import CodeAnalyzer
+from .structure import prepare_file_tree
 from .templates import ReviewTemplates
 
 logger = get_logger(__name__)
@@ -20,6 +23,19 @@ config = get_config()
 class ReviewOrchestrator:
     """Orchestrates the review process for repositories."""
 
+    MAX_CONCURRENT_FETCHES = 8
+    MAX_CONCURRENT_REVIEWS = 8
+    CI_FILES = frozenset((".github", ".gitlab-ci.yml", "Jenkinsfile", "Dockerfile"))
+
+    # (extensions, marker files, label with a marker, label without), in priority order
+    PROJECT_TYPE_MARKERS = (
+        (("py",), ("requirements.txt", "pyproject.toml"), "Python Application", "Python Library"),
+        (("js", "ts"), ("package.json",), "Node.js Application", "JavaScript/TypeScript Library"),
+        (("go",), (), "Go Application/Library", None),
+        (("rs",), (), "Rust Application/Library", None),
+        (("java",), (), "Java Application", None),
+    )
+
     def __init__(
         self,
         github_client: GitHubClient,
@@ -30,6 +46,67 @@ class ReviewOrchestrator:
         self.llm = llm_client or LLMClient()
         self.db = db
         self.analyzer = CodeAnalyzer(self.github, self.llm)
+        self._tree_cache = TTLCache(maxsize=256, ttl=config.github.cache_ttl)
+        self._content_cache = TTLCache(maxsize=1024, ttl=config.github.cache_ttl)
+        self._fetch_locks: Dict[Tuple[Any, ...], asyncio.Lock] = {}
+        # Last seen REPO_STATUS.md per repo, revalidated with its ETag.
+        self._status_files: Dict[str, FileContent] = {}
+
+    async def _cached_fetch(
+        self, cache: TTLCache, key: Tuple[Any, ...], fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Return a cached value, letting only one caller fetch it on a miss."""
+        value = cache.get(key)
+        if value is not None:
+            return value
+
+        lock = self._fetch_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            value = cache.get(key)
+            if value is None:
+                value = await fetch()
+                if value:
+                    cache.set(key, value)
+
+        self._fetch_locks.pop(key, None)
+        return value
+
+    async def _cached_get_file_tree(
+        self, repo_full_name: str, max_depth: int, max_files: int
+    ) -> List[Dict[str, Any]]:
+        """Get a repository file tree through the session cache."""
+        return await self._cached_fetch(
+            self._tree_cache,
+            (repo_full_name, max_depth, max_files),
+            lambda: self.github.get_file_tree(
+                repo_full_name, max_depth=max_depth, max_files=max_files
+            ),
+        )
+
+    async def _cached_get_file_content(
+        self, repo_full_name: str, path: str
+    ) -> Optional[FileContent]:
+        """Get file content through the session cache."""
+        return await self._cached_fetch(
+            self._content_cache,
+            (repo_full_name, path),
+            lambda: self.github.get_file_content(repo_full_name, path),
+        )
+
+    async def _cached_get_blob(
+        self, repo_full_name: str, sha: str, path: str
+    ) -> Optional[FileContent]:
+        """Get blob content through the session cache (blobs are keyed by SHA)."""
+        return await self._cached_fetch(
+            self._content_cache,
+            (repo_full_name, sha),
+            lambda: self.github.get_blob(repo_full_name, sha, path),
+        )
+
+    def clear_cache(self) -> None:
+        """Clear cached file trees and contents."""
+        self._tree_cache.clear()
+        self._content_cache.clear()
 
     def _is_status_file_meaningful(self, content: str) -> bool:
         """Check if REPO_STATUS.md has meaningful content."""
@@ -42,20 +119,56 @@ class ReviewOrchestrator:
         score_count = sum(1 for section in required_sections if section.lower() in content_lower)
         return score_count >= 2
 
-    async def _get_existing_status(self, repo_full_name: str) -> Optional[str]:
-        """Get existing REPO_STATUS.md content if it exists."""
+    async def _get_existing_status(self, repo_full_name: str) -> Optional[FileContent]:
+        """Get existing REPO_STATUS.md file if it exists."""
+        cached = self._status_files.get(repo_full_name)
         try:
-            content = await self.github.get_file_content(repo_full_name, "REPO_STATUS.md")
-            if content:
-                return content.content
+            status, status_file = await self.github.get_file_content_conditional(
+                repo_full_name, "REPO_STATUS.md", etag=cached.etag if cached else None
+            )
         except Exception:
-            pass
-        return None
+            return None
 
-    async def _update_existing_status(self, repo_full_name: str, existing_content: str) -> str:
-        """Add an update section to existing status file."""
-        today = datetime.utcnow().strftime("%Y-%m-%d")
+        if status == 304 and cached:
+            return cached
+
+        if status_file:
+            self._status_files[repo_full_name] = status_file
+        else:
+            self._status_files.pop(repo_full_name, None)
+        return status_file
+
+    async def _fetch_file_contents(
+        self, repo_full_name: str, file_tree: List[Dict[str, Any]]
+    ) -> Dict[str, str]:
+        """Fetch contents of the given files concurrently."""
+        files = [f for f in file_tree if f["type"] == "file"]
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_FETCHES)
+
+        async def fetch(file_info: Dict[str, Any]):
+            path = file_info["path"]
+            async with semaphore:
+                if file_info.get("sha"):
+                    return path, await self._cached_get_blob(repo_full_name, file_info["sha"], path)
+                return path, await self._cached_get_file_content(repo_full_name, path)
+
+        results = await asyncio.gather(*(fetch(f) for f in files), return_exceptions=True)
+
+        file_contents = {}
+        for result in results:
+            if isinstance(result, Exception):
+                logger.debug(f"Error fetching file from {repo_full_name}: {result}")
+                continue
+            path, content = result
+            if content:
+                file_contents[path] = content.content
+
+        return file_contents
 
+    async def _update_existing_status(
+        self, repo_full_name: str, existing_content: str, today: str
+    ) -> str:
+        """Add an update section to existing status file."""
         update_section = f"""
 
 ---
@@ -72,23 +185,26 @@ Agent performed a check - existing review is still current. No new issues detect
     async def review_repository(self, repo: Repository, force: bool = False) -> Dict[str, Any]:
         """Perform a comprehensive review of a repository."""
         logger.info(f"Starting review of {repo.full_name}")
+        now = datetime.now(timezone.utc)
+        today = now.strftime("%Y-%m-%d")
 
         existing_status = await self._get_existing_status(repo.full_name)
 
         if existing_status and not force:
-            if self._is_status_file_meaningful(existing_status):
+            if self._is_status_file_meaningful(existing_status.content):
                 logger.info(f"Found existing meaningful status for {repo.full_name}, adding update...")
 
-                updated_content = await self._update_existing_status(repo.full_name, existing_status)
+                updated_content = await self._update_existing_status(
+                    repo.full_name, existing_status.content, today
+                )
 
-                sha = await self.github.get_file_content(repo.full_name, "REPO_STATUS.md")
                 await self.github.create_or_update_file(
                     full_name=repo.full_name,
                     path="REPO_STATUS.md",
                     content=updated_content,
-                    message=f"docs: Review update - {datetime.utcnow().strftime('%Y-%m-%d')}",
+                    message=f"docs: Review update - {today}",
                     branch=repo.default_branch,
-                    sha=sha.sha if sha else None,
+                    sha=existing_status.sha,
                 )
 
                 return {
@@ -104,27 +220,21 @@ Agent performed a check - existing review is still current. No new issues detect
                     "total_lines": 0,
                     "todos": [],
                     "structure_info": {},
-                    "completed_at": datetime.utcnow(),
+                    "completed_at": now,
                     "message": "Existing status file verified and updated with timestamp",
                 }
 
         try:
-            file_tree = await self.github.get_file_tree(
+            file_tree = await self._cached_get_file_tree(
                 repo.full_name,
                 max_depth=3,
                 max_files=config.review.max_files_per_repo,
             )
+            prepare_file_tree(file_tree)
 
             structure_info = self._analyze_structure(file_tree, repo)
 
-            file_contents = {}
-            for file_info in file_tree[:20]:
-                if file_info["type"] == "file":
-                    content = await self.github.get_file_content(
-                        repo.full_name, file_info["path"]
-                    )
-                    if content:
-                        file_contents[file_info["path"]] = content.content
+            file_contents = await self._fetch_file_contents(repo.full_name, file_tree[:20])
 
             ai_review = await self.llm.review_repository(
                 repo.full_name, file_contents, structure_info
@@ -158,7 +268,7 @@ Agent performed a check - existing review is still current. No new issues detect
                 "total_lines": analysis_result["total_lines"],
                 "todos": analysis_result["all_todos"],
                 "structure_info": structure_info,
-                "completed_at": datetime.utcnow(),
+                "completed_at": datetime.now(timezone.utc),
             }
 
             if self.db:
@@ -173,42 +283,69 @@ Agent performed a check - existing review is still current. No new issues detect
                 "status": "failed",
                 "repository_name": repo.full_name,
                 "error": str(e),
-                "completed_at": datetime.utcnow(),
+                "completed_at": datetime.now(timezone.utc),
             }
 
-    async def review_all(
+    async def iter_review_all(
         self, repos: Optional[List[Repository]] = None, force: bool = False
-    ) -> List[Dict[str, Any]]:
-        """Review all repositories."""
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Review all repositories, yielding each result as soon as it is ready."""
         if repos is None:
             repos = await self.github.list_all_repositories()
 
-        results = []
-        rate_limiter = asyncio.Semaphore(2)
+        rate_limiter = asyncio.Semaphore(self.MAX_CONCURRENT_REVIEWS)
 
         async def review_with_limit(repo: Repository) -> Dict[str, Any]:
             async with rate_limiter:
-                await asyncio.sleep(config.github.rate_limit_wait)
-                return await self.review_repository(repo, force=force)
-
-        tasks = [review_with_limit(repo) for repo in repos]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        completed = [
-            r if isinstance(r, dict) and r.get("status") in ["completed", "skipped"]
-            else None
-            for r in results
-        ]
-
-        skipped = [
-            r if isinstance(r, dict) and r.get("status") == "skipped"
-            else None
-            for r in results
-        ]
+                await self.github.throttle.acquire()
+                try:
+                    return await self.review_repository(repo, force=force)
+                except Exception as e:
+                    logger.error(f"Review task failed for {repo.full_name}: {e}")
+                    return {
+                        "status": "failed",
+                        "repository_name": repo.full_name,
+                        "error": str(e),
+                        "completed_at": datetime.now(timezone.utc),
+                    }
+
+        tasks = [asyncio.create_task(review_with_limit(repo)) for repo in repos]
+        try:
+            for done_count, next_done in enumerate(asyncio.as_completed(tasks), 1):
+                result = await next_done
+                logger.info(
+                    f"Finished {result.get('repository_name')}: {result.get('status')} "
+                    f"({done_count}/{len(tasks)})"
+                )
+                yield result
+        finally:
+            # Cancel outstanding reviews if we were cancelled, failed or the
+            # consumer stopped iterating, so no further GitHub calls are spent.
+            pending = [t for t in tasks if not t.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
 
-        logger.info(f"Reviewed: {len([c for c in completed if c and c.get('status')=='completed'])} | "
-                   f"Skipped (existing review): {len([s for s in skipped if s])} | "
-                   f"Failed: {len([r for r in results if isinstance(r, Exception) or (isinstance(r, dict) and r.get('status')=='failed')])}")
+    async def review_all(
+        self, repos: Optional[List[Repository]] = None, force: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Review all repositories."""
+        results = [r async for r in self.iter_review_all(repos, force=force)]
+
+        reviewed = skipped = failed = 0
+        for r in results:
+            if isinstance(r, Exception):
+                failed += 1
+            elif isinstance(r, dict):
+                status = r.get("status")
+                reviewed += status == "completed"
+                skipped += status == "skipped"
+                failed += status == "failed"
+
+        logger.info(
+            f"Reviewed: {reviewed} | Skipped (existing review): {skipped} | Failed: {failed}"
+        )
 
         return results
 
@@ -217,25 +354,24 @@ Agent performed a check - existing review is still current. No new issues detect
     ) -> Dict[str, Any]:
         """Analyze repository structure."""
         dirs = set()
-        files_by_type = {}
+        files_by_type: Counter = Counter()
+        has_tests = has_docs = has_ci = False
 
         for item in file_tree:
+            name = item["name"]
             if item["type"] == "dir":
                 dirs.add(item["path"])
+                path_lc = item["_path_lc"]
+                has_tests = has_tests or "test" in path_lc or "spec" in path_lc
+                has_docs = has_docs or "doc" in path_lc
             else:
-                ext = item["path"].split(".")[-1] if "." in item["path"] else "unknown"
-                files_by_type[ext] = files_by_type.get(ext, 0) + 1
+                _, dot, ext = item["path"].rpartition(".")
+                files_by_type[ext if dot else "unknown"] += 1
+                has_docs = has_docs or item["_name_lc"] == "readme.md"
 
-        project_type = self._detect_project_type(files_by_type, dirs)
+            has_ci = has_ci or name in self.CI_FILES
 
-        has_tests = any("test" in d.lower() or "spec" in d.lower() for d in dirs)
-        has_docs = any("doc" in d.lower() for d in dirs) or any(
-            f["name"].lower() == "readme.md" for f in file_tree if f["type"] == "file"
-        )
-        has_ci = any(
-            f["name"] in (".github", ".gitlab-ci.yml", "Jenkinsfile", "Dockerfile")
-            for f in file_tree
-        )
+        project_type = self._detect_project_type(files_by_type, dirs)
 
         return {
             "project_type": project_type,
@@ -252,26 +388,13 @@ Agent performed a check - existing review is still current. No new issues detect
         self, files_by_type: Dict[str, int], dirs: set
     ) -> str:
         """Detect the type of project based on files."""
-        if "py" in files_by_type:
-            if "requirements.txt" in files_by_type or "pyproject.toml" in files_by_type:
-                return "Python Application"
-            return "Python Library"
-
-        if "js" in files_by_type or "ts" in files_by_type:
-            if "package.json" in files_by_type:
-                return "Node.js Application"
-            return "JavaScript/TypeScript Library"
-
-        if "go" in files_by_type:
-            return "Go Application/Library"
-
-        if "rs" in files_by_type:
-            return "Rust Application/Library"
-
-        if "java" in files_by_type:
-            return "Java Application"
+        for extensions, markers, app_label, lib_label in self.PROJECT_TYPE_MARKERS:
+            if any(ext in files_by_type for ext in extensions):
+                if not markers or any(m in files_by_type for m in markers):
+                    return app_label
+                return lib_label
 
-        if any(d in dirs for d in ["src", "include", "lib"]):
+        if not dirs.isdisjoint(("src", "include", "lib")):
             return "C/C++ Project"
 
         if "html" in files_by_type or "css" in files_by_type:
@@ -290,9 +413,12 @@ Agent performed a check - existing review is still current. No new issues detect
             if t["priority"] == "high"
         ]
 
+        seen = set(stuck_areas)
         for todo in high_priority_todos[:5]:
-            if todo not in stuck_areas:
-                stuck_areas.append(f"TODO: {todo}")
+            entry = f"TODO: {todo}"
+            if todo not in seen and entry not in seen:
+                stuck_areas.append(entry)
+                seen.add(entry)
 
         return stuck_areas[:15]
 
@@ -1,7 +1,8 @@
 """Structure analyzer for detecting project types and architecture."""
 
+import re
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Pattern, Tuple
 
 from ..core.config import get_config
 from ..core.logging_ import get_logger
@@ -11,6 +12,15 @@ logger = get_logger(__name__)
 config = get_config()
 
 
+def prepare_file_tree(file_tree: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Cache lowercased name and path on each tree entry, once per entry."""
+    for item in file_tree:
+        if "_path_lc" not in item:
+            item["_name_lc"] = item["name"].lower()
+            item["_path_lc"] = item["path"].lower()
+    return file_tree
+
+
 @dataclass
 class ProjectType:
     """Detected project type information."""
@@ -141,6 +151,15 @@ class StructureAnalyzer:
         "Docs",
     ]
 
+    _TEST_DIRS_LC = frozenset(d.lower() for d in TEST_DIRS)
+    _DOC_DIRS_LC = frozenset(d.lower() for d in DOC_DIRS)
+    # Matched against pre-lowercased paths (see prepare_file_tree).
+    _KEY_FILE_RE = re.compile(
+        "|".join(re.escape(k) for k in dict.fromkeys(map(str.lower, KEY_FILES)))
+    )
+
+    _FRAMEWORK_MATCHERS: Dict[str, Any] = {}
+
     def __init__(self):
         self.detected_language = None
         self.detected_framework = None
@@ -153,6 +172,8 @@ class StructureAnalyzer:
         """Analyze repository structure."""
         result = StructureInfo()
 
+        prepare_file_tree(file_tree)
+
         self._categorize_files(file_tree, result)
 
         self._detect_project_type(result)
@@ -176,9 +197,10 @@ class StructureAnalyzer:
             name = item["name"]
 
             if item["type"] == "dir":
-                if name.lower() in [d.lower() for d in self.TEST_DIRS]:
+                name_lc = item["_name_lc"]
+                if name_lc in self._TEST_DIRS_LC:
                     result.test_directories.append(path)
-                elif name.lower() in [d.lower() for d in self.DOC_DIRS]:
+                elif name_lc in self._DOC_DIRS_LC:
                     result.documentation_files.append(path)
                 elif name in ("src", "lib", "include", "internal"):
                     result.source_directories.append(path)
@@ -186,9 +208,8 @@ class StructureAnalyzer:
                 if name in self.KEY_FILES:
                     result.key_files[name] = True
 
-                for config_file in self.KEY_FILES:
-                    if config_file.lower() in path.lower():
-                        result.config_files.append(path)
+                if self._KEY_FILE_RE.search(item["_path_lc"]):
+                    result.config_files.append(path)
 
     def _detect_project_type(self, result: StructureInfo) -> None:
         """Detect the programming language and project type."""
@@ -223,15 +244,51 @@ class StructureAnalyzer:
         if not file_contents or self.detected_language not in self.PROJECT_PATTERNS:
             return
 
-        frameworks = self.PROJECT_PATTERNS[self.detected_language].get("frameworks", {})
+        matcher = self._get_framework_matcher(self.detected_language)
+        if matcher is None:
+            return
+
+        pattern, framework_by_indicator, rank = matcher
+        best = None
 
+        for content in file_contents.values():
+            for match in pattern.finditer(content):
+                framework = framework_by_indicator[match.group(0)]
+                if best is None or rank[framework] < rank[best]:
+                    best = framework
+                    if rank[best] == 0:
+                        break
+            if best is not None and rank[best] == 0:
+                break
+
+        if best:
+            result.project_type.framework = best
+            self.detected_framework = best
+
+    @classmethod
+    def _get_framework_matcher(
+        cls, language: str
+    ) -> Optional[Tuple[Pattern[str], Dict[str, str], Dict[str, int]]]:
+        """Get a single-pass matcher for a language's framework indicators."""
+        if language in cls._FRAMEWORK_MATCHERS:
+            return cls._FRAMEWORK_MATCHERS[language]
+
+        frameworks = cls.PROJECT_PATTERNS[language].get("frameworks", {})
+        framework_by_indicator = {}
         for framework, indicators in frameworks.items():
             for indicator in indicators:
-                for path, content in file_contents.items():
-                    if indicator in content:
-                        result.project_type.framework = framework
-                        self.detected_framework = framework
-                        return
+                framework_by_indicator.setdefault(indicator, framework)
+
+        matcher = None
+        if framework_by_indicator:
+            # Longest first so e.g. "react-dom" is not cut short by "react".
+            indicators = sorted(framework_by_indicator, key=len, reverse=True)
+            pattern = re.compile("|".join(re.escape(i) for i in indicators))
+            rank = {framework: i for i, framework in enumerate(frameworks)}
+            matcher = (pattern, framework_by_indicator, rank)
+
+        cls._FRAMEWORK_MATCHERS[language] = matcher
+        return matcher
 
     def _analyze_directories(
         self, file_tree: List[Dict[str, Any]], result: StructureInfo
@@ -251,29 +308,27 @@ class StructureAnalyzer:
 
     def _build_tree(self, file_tree: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Build a tree structure from flat file list."""
-        tree = {}
+        tree: Dict[str, Any] = {}
+        nodes: Dict[str, Dict[str, Any]] = {"": tree}
 
-        for item in file_tree:
-            parts = item["path"].split("/")
-            current = tree
+        def get_node(path: str) -> Dict[str, Any]:
+            node = nodes.get(path)
+            if node is None:
+                parent, _, name = path.rpartition("/")
+                node = get_node(parent).setdefault(name, {})
+                nodes[path] = node
+            return node
 
-            for i, part in enumerate(parts):
-                if part not in current:
-                    current[part] = {}
-
-                if i == len(parts) - 1:
-                    current[part] = {"_file": item}
-                else:
-                    if "_files" not in current[part]:
-                        current[part]["_files"] = []
-
-                current = current[part]
+        for item in file_tree:
+            get_node(item["path"])["_file"] = item
 
         return tree
 
     def _detect_patterns(self, result: StructureInfo) -> None:
         """Detect common project patterns."""
         patterns = []
+        config_paths = set(result.config_files)
+        config_lc = "\n".join(result.config_files).lower()
 
         if result.test_directories:
             patterns.append("has_tests")
@@ -281,22 +336,16 @@ class StructureAnalyzer:
         if "README.md" in result.key_files:
             patterns.append("has_documentation")
 
-        if any("docker" in f.lower() for f in result.config_files):
+        if "docker" in config_lc:
             patterns.append("has_docker")
 
-        if any(
-            f in result.config_files
-            for f in [".eslintrc", ".prettierrc", "tsconfig.json"]
-        ):
+        if not config_paths.isdisjoint((".eslintrc", ".prettierrc", "tsconfig.json")):
             patterns.append("has_linting")
 
-        if any(
-            f in result.config_files
-            for f in ["pyproject.toml", "package.json", "go.mod"]
-        ):
+        if not config_paths.isdisjoint(("pyproject.toml", "package.json", "go.mod")):
             patterns.append("has_dependency_management")
 
-        if any("github" in f.lower() for f in result.config_files):
+        if "github" in config_lc:
             patterns.append("has_ci_cd")
 
         if result.source_directories:
@@ -314,13 +363,10 @@ class StructureAnalyzer:
         if not result.test_directories:
             recommendations.append("Consider adding tests for better code quality")
 
-        if not any("docker" in f.lower() for f in result.config_files):
+        if "has_docker" not in result.detected_patterns:
             recommendations.append("Consider adding Docker configuration for deployment")
 
-        if not any(
-            f in result.config_files
-            for f in [".gitignore", ".dockerignore"]
-        ):
+        if set(result.config_files).isdisjoint((".gitignore", ".dockerignore")):
             recommendations.append("Add .gitignore and .dockerignore files")
 
         if result.detected_language == "python" and "requirements.txt" not in result.key_files:
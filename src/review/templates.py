@@ -6,6 +6,8 @@ from typing import Any, Dict
 class ReviewTemplates:
     """Collection of prompt templates for code review."""
 
+    _INDEX: Dict[str, str] = {}
+
     REPOSITORY_OVERVIEW = """
 Review this repository: {repo_name}
 
@@ -136,7 +138,14 @@ Identify:
         cls, template_name: str, **kwargs: Any
     ) -> str:
         """Format a template with provided values."""
-        template = getattr(cls, template_name.upper(), None)
+        template = cls._INDEX.get(template_name.lower())
         if template is None:
             raise ValueError(f"Unknown template: {template_name}")
-        return template.format(**kwargs)
+        return template.format_map(kwargs)
+
+
+ReviewTemplates._INDEX = {
+    name.lower(): value
+    for name, value in vars(ReviewTemplates).items()
+    if name.isupper() and isinstance(value, str)
+}
@@ -1,11 +1,15 @@
 """Task dispatcher for managing task queues and work distribution."""
 
 import asyncio
+import heapq
+import itertools
+import time
 import uuid
+from collections import Counter, deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Deque, Dict, List, Optional
 
 from ..core.config import get_config
 from ..core.logging_ import get_logger
@@ -24,6 +28,24 @@ class QueueType(Enum):
     REPO_SPECIFIC = "repo_specific"
 
 
+# Lower rank is served first; within a rank, task priority then FIFO order.
+QUEUE_RANK = {
+    QueueType.CRITICAL: 0,
+    QueueType.GENERAL: 1,
+    QueueType.REPO_SPECIFIC: 2,
+    QueueType.BACKGROUND: 3,
+}
+
+# Cap on tasks pending for one repository in the repo-specific queue.
+MAX_PENDING_PER_REPO = 50
+
+# Retried tasks go ahead of new work so a failing task settles quickly.
+RETRY_RANK = -1
+
+# Ranks ahead of every real task so idle workers see it immediately.
+SHUTDOWN_RANK = -2
+
+
 @dataclass
 class QueueStats:
     """Statistics for a queue."""
@@ -36,6 +58,15 @@ class QueueStats:
     avg_processing_time: float = 0.0
 
 
+@dataclass
+class QueueCounters:
+    """Running totals for a queue."""
+    processing: int = 0
+    completed: int = 0
+    failed: int = 0
+    processing_time: float = 0.0
+
+
 @dataclass
 class WorkerInfo:
     """Information about a worker."""
@@ -52,24 +83,32 @@ class TaskDispatcher:
     """Manages task queues and distributes work to workers."""
 
     def __init__(self, max_workers: int = 5):
-        self.queues: Dict[QueueType, asyncio.Queue] = {
-            queue_type: asyncio.Queue(maxsize=100) for queue_type in QueueType
-        }
-        self.repo_queues: Dict[str, asyncio.Queue] = {}
+        self.max_pending = 100 * len(QueueType)
+        self._pending: List[tuple] = []
+        self._has_pending = asyncio.Event()
+        self._has_room = asyncio.Event()
+        self._has_room.set()
+        self._seq = itertools.count()
+        self._pending_counts: Counter = Counter()
+        self.repo_counts: Counter = Counter()
         self.workers: Dict[str, WorkerInfo] = {}
         self.worker_tasks: Dict[str, asyncio.Task] = {}
         self.max_workers = max_workers
-        self.running = False
         self.task_handlers: Dict[TaskType, Callable] = {}
-        self.completed_tasks: List[Task] = []
-        self.failed_tasks: List[Task] = []
+        self.completed_tasks: Deque[Task] = deque(maxlen=config.task.max_history)
+        self.failed_tasks: Deque[Task] = deque(maxlen=config.task.max_history)
+        self.keep_task_history = config.task.keep_history
+        self._stats: Dict[QueueType, QueueCounters] = {qt: QueueCounters() for qt in QueueType}
+        self._unfinished_tasks = 0
+        self._finished = asyncio.Event()
+        self._finished.set()
 
     def register_handler(
         self, task_type: TaskType, handler: Callable[[Task], Any]
     ) -> None:
         """Register a handler for a task type."""
         self.task_handlers[task_type] = handler
-        logger.info(f"Registered handler for task type: {task_type.value}")
+        logger.info("Registered handler for task type: %s", task_type.value)
 
     async def enqueue(
         self,
@@ -77,83 +116,162 @@ class TaskDispatcher:
         queue_type: QueueType = QueueType.GENERAL,
         repo_name: Optional[str] = None,
     ) -> bool:
-        """Add a task to the queue."""
-        try:
-            if queue_type == QueueType.REPO_SPECIFIC and repo_name:
-                if repo_name not in self.repo_queues:
-                    self.repo_queues[repo_name] = asyncio.Queue(maxsize=50)
-                await self.repo_queues[repo_name].put(task)
-            else:
-                await self.queues[queue_type].put(task)
-
-            logger.info(f"Enqueued task: {task.id} ({task.task_type.value})")
-            return True
+        """Add a task to the queue, waiting while it or the repository's share is full."""
+        if queue_type != QueueType.REPO_SPECIFIC:
+            repo_name = None
+
+        while len(self._pending) >= self.max_pending or (
+            repo_name and self.repo_counts[repo_name] >= MAX_PENDING_PER_REPO
+        ):
+            self._has_room.clear()
+            await self._has_room.wait()
+
+        self._push(
+            (QUEUE_RANK[queue_type], task.priority.value, next(self._seq), queue_type, task, repo_name)
+        )
+        self._pending_counts[queue_type] += 1
+        if repo_name:
+            self.repo_counts[repo_name] += 1
+        self._add_unfinished(1)
 
-        except asyncio.QueueFull:
-            logger.warning(f"Queue full, task {task.id} dropped")
-            return False
+        logger.info("Enqueued task: %s (%s)", task.id, task.task_type.value)
+        return True
 
     async def enqueue_batch(
         self, tasks: List[Task], queue_type: QueueType = QueueType.GENERAL
     ) -> int:
         """Add multiple tasks to the queue."""
-        enqueued = 0
+        if len(self._pending) + len(tasks) > self.max_pending:
+            enqueued = 0
+            for task in tasks:
+                if await self.enqueue(task, queue_type):
+                    enqueued += 1
+            return enqueued
+
+        rank = QUEUE_RANK[queue_type]
         for task in tasks:
-            if await self.enqueue(task, queue_type):
-                enqueued += 1
-        return enqueued
-
-    async def dequeue(self, queue_type: QueueType) -> Optional[Task]:
-        """Take a task from the queue."""
-        try:
-            return await asyncio.wait_for(
-                self.queues[queue_type].get(),
-                timeout=1.0,
+            heapq.heappush(
+                self._pending, (rank, task.priority.value, next(self._seq), queue_type, task, None)
             )
-        except asyncio.TimeoutError:
-            return None
+
+        if tasks:
+            self._pending_counts[queue_type] += len(tasks)
+            self._has_pending.set()
+            self._add_unfinished(len(tasks))
+            logger.info("Enqueued %s tasks (%s)", len(tasks), queue_type.value)
+
+        return len(tasks)
+
+    def _push(self, entry: tuple) -> None:
+        """Add an entry to the pending heap and wake waiting workers."""
+        heapq.heappush(self._pending, entry)
+        self._has_pending.set()
+
+    async def dequeue(self) -> Optional[Task]:
+        """Take the most urgent task, waiting until one is available.
+
+        Returns None when the worker should shut down.
+        """
+        while not self._pending:
+            self._has_pending.clear()
+            await self._has_pending.wait()
+
+        _, _, _, queue_type, task, repo_name = heapq.heappop(self._pending)
+        self._has_room.set()
+        if task is not None:
+            self._pending_counts[queue_type] -= 1
+            task.metadata["queue"] = queue_type.value
+        if repo_name:
+            self._release_repo(repo_name)
+        return task
+
+    def _add_unfinished(self, count: int) -> None:
+        """Adjust the number of tasks queued or running."""
+        self._unfinished_tasks += count
+        if self._unfinished_tasks > 0:
+            self._finished.clear()
+        else:
+            self._finished.set()
+
+    def task_done(self) -> None:
+        """Mark a dequeued task as finished, like asyncio.Queue.task_done."""
+        if self._unfinished_tasks <= 0:
+            raise ValueError("task_done() called too many times")
+        self._add_unfinished(-1)
+
+    async def join(self) -> None:
+        """Wait until every queued task has been marked done."""
+        await self._finished.wait()
+
+    def _release_repo(self, repo_name: str, count: int = 1) -> None:
+        """Drop pending-task slots held by a repository."""
+        self.repo_counts[repo_name] -= count
+        if self.repo_counts[repo_name] <= 0:
+            del self.repo_counts[repo_name]
 
     async def process_task(self, task: Task) -> bool:
         """Process a single task."""
-        task.status = TaskStatus.IN_PROGRESS
-        task.started_at = datetime.utcnow()
+        queue_type = QueueType(task.metadata.get("queue", QueueType.GENERAL.value))
+        counters = self._stats[queue_type]
 
         handler = self.task_handlers.get(task.task_type)
         if not handler:
-            logger.warning(f"No handler for task type: {task.task_type.value}")
+            logger.warning("No handler for task type: %s", task.task_type.value)
             task.error = f"No handler for task type: {task.task_type.value}"
             task.status = TaskStatus.FAILED
-            self.failed_tasks.append(task)
+            self._record_failure(task, counters)
             return False
 
+        task.status = TaskStatus.IN_PROGRESS
+        task.started_at = datetime.utcnow()
+        start_time = time.monotonic()
+        counters.processing += 1
+
         try:
-            logger.info(f"Processing task: {task.id}")
+            logger.debug("Processing task: %s", task.id)
             result = await handler(task)
-
-            task.status = TaskStatus.COMPLETED
-            task.completed_at = datetime.utcnow()
-            task.result = str(result) if result else "Completed successfully"
-            self.completed_tasks.append(task)
-
-            logger.info(f"Task completed: {task.id}")
-            return True
-
         except Exception as e:
-            logger.error(f"Task failed: {task.id} - {e}")
-            task.status = TaskStatus.FAILED
+            logger.error("Task failed: %s - %s", task.id, e)
             task.error = str(e)
             task.retries += 1
 
             if task.retries < task.max_retries:
                 task.status = TaskStatus.QUEUED
-                await self.enqueue(task)
+                self._push(
+                    (RETRY_RANK, task.priority.value, next(self._seq), queue_type, task, None)
+                )
+                self._pending_counts[queue_type] += 1
             else:
-                self.failed_tasks.append(task)
+                task.status = TaskStatus.FAILED
+                self._record_failure(task, counters)
 
             return False
+        finally:
+            counters.processing -= 1
+
+        counters.processing_time += time.monotonic() - start_time
+        counters.completed += 1
+        task.status = TaskStatus.COMPLETED
+        task.completed_at = datetime.utcnow()
+        task.result = str(result) if result else "Completed successfully"
+        if self.keep_task_history:
+            self.completed_tasks.append(task)
+
+        logger.debug("Task completed: %s", task.id)
+        return True
+
+    def _record_failure(self, task: Task, counters: QueueCounters) -> None:
+        """Count a task that has permanently failed."""
+        counters.failed += 1
+        if self.keep_task_history:
+            self.failed_tasks.append(task)
 
     async def worker_loop(self, worker_id: str, queue_type: QueueType) -> None:
-        """Worker loop for processing tasks from a queue."""
+        """Worker loop for processing tasks.
+
+        Every worker serves the shared pending heap in queue-rank order; queue_type
+        only names the worker.
+        """
         worker = WorkerInfo(
             id=worker_id,
             name=f"Worker-{worker_id}",
@@ -165,32 +283,39 @@ class TaskDispatcher:
         )
         self.workers[worker_id] = worker
 
-        logger.info(f"Worker {worker_id} started for queue {queue_type.value}")
+        logger.info("Worker %s started for queue %s", worker_id, queue_type.value)
 
-        while self.running:
+        while True:
             try:
-                task = await self.dequeue(queue_type)
-                if task:
-                    worker.current_task = task.id
-                    worker.status = "processing"
+                task = await self.dequeue()
+                if task is None:
+                    break
 
+                worker.current_task = task.id
+                worker.status = "processing"
+
+                try:
                     success = await self.process_task(task)
+                finally:
+                    if task.status != TaskStatus.QUEUED:
+                        self.task_done()
 
-                    if success:
-                        worker.tasks_completed += 1
-                    else:
-                        worker.tasks_failed += 1
+                if success:
+                    worker.tasks_completed += 1
+                else:
+                    worker.tasks_failed += 1
 
-                    worker.current_task = None
-                    worker.status = "running"
+                worker.current_task = None
+                worker.status = "running"
 
             except Exception as e:
-                logger.error(f"Worker {worker_id} error: {e}")
+                logger.error("Worker %s error: %s", worker_id, e)
                 await asyncio.sleep(1)
 
-        logger.info(f"Worker {worker_id} stopped")
+        worker.status = "stopped"
+        logger.info("Worker %s stopped", worker_id)
 
-    async def start_workers(
+    def start_workers(
         self, queue_type: QueueType, num_workers: Optional[int] = None
     ) -> List[str]:
         """Start workers for a queue."""
@@ -204,65 +329,58 @@ class TaskDispatcher:
             )
             workers.append(worker_id)
 
-        logger.info(f"Started {count} workers for {queue_type.value}")
+        logger.info("Started %s workers for %s", count, queue_type.value)
         return workers
 
     async def start_all_workers(self) -> None:
         """Start workers for all queues."""
-        self.running = True
-
         for queue_type in QueueType:
-            await self.start_workers(queue_type)
+            self.start_workers(queue_type)
 
-    async def stop_workers(self) -> None:
-        """Stop all workers."""
-        self.running = False
+    async def stop_workers(self, timeout: float = 5.0) -> None:
+        """Stop all workers, letting in-flight tasks finish within timeout."""
+        for _ in self.worker_tasks:
+            self._push((SHUTDOWN_RANK, 0, next(self._seq), None, None, None))
 
-        for task in self.worker_tasks.values():
-            task.cancel()
+        if self.worker_tasks:
+            _, pending = await asyncio.wait(self.worker_tasks.values(), timeout=timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
 
         self.worker_tasks.clear()
-        logger.info("All workers stopped")
 
-    async def get_next_task(self, priority: List[QueueType] = None) -> Optional[Task]:
-        """Get the next task respecting priority order."""
-        priority = priority or [
-            QueueType.CRITICAL,
-            QueueType.GENERAL,
-            QueueType.BACKGROUND,
-        ]
+        # Cancelled workers never consume their sentinels; drop them so they neither
+        # stop the next generation of workers nor count toward max_pending.
+        self._pending = [entry for entry in self._pending if entry[0] != SHUTDOWN_RANK]
+        heapq.heapify(self._pending)
+        if not self._pending:
+            self._has_pending.clear()
+        self._has_room.set()
 
-        for queue_type in priority:
-            task = await self.dequeue(queue_type)
-            if task:
-                return task
+        # No worker is running now, so only the tasks still pending are unfinished.
+        self._add_unfinished(len(self._pending) - self._unfinished_tasks)
+        logger.info("All workers stopped")
 
-        return None
+    async def get_next_task(self) -> Optional[Task]:
+        """Get the next task respecting queue rank and task priority."""
+        return await self.dequeue()
 
     def get_queue_stats(self, queue_type: QueueType) -> QueueStats:
         """Get statistics for a queue."""
-        q = self.queues[queue_type]
-
-        completed = [t for t in self.completed_tasks if t.status == TaskStatus.COMPLETED]
-        failed = [t for t in self.failed_tasks if t.status == TaskStatus.FAILED]
-
-        processing_times = [
-            (t.completed_at - t.started_at).total_seconds()
-            for t in completed
-            if t.started_at and t.completed_at
-        ]
+        pending = self._pending_counts[queue_type]
+        counters = self._stats[queue_type]
 
-        avg_time = sum(processing_times) / len(processing_times) if processing_times else 0
+        avg_time = counters.processing_time / counters.completed if counters.completed else 0
 
         return QueueStats(
             queue_name=queue_type.value,
-            total_tasks=q.qsize() + len(completed) + len(failed),
-            pending_tasks=q.qsize(),
-            processing_tasks=sum(
-                1 for w in self.workers.values() if w.current_task
-            ),
-            completed_tasks=len(completed),
-            failed_tasks=len(failed),
+            total_tasks=pending + counters.processing + counters.completed + counters.failed,
+            pending_tasks=pending,
+            processing_tasks=counters.processing,
+            completed_tasks=counters.completed,
+            failed_tasks=counters.failed,
             avg_processing_time=avg_time,
         )
 
@@ -276,17 +394,24 @@ class TaskDispatcher:
 
     def clear_queue(self, queue_type: QueueType) -> int:
         """Clear all tasks from a queue."""
+        kept = []
         count = 0
-        q = self.queues[queue_type]
 
-        while not q.empty():
-            try:
-                q.get_nowait()
-                count += 1
-            except asyncio.QueueEmpty:
-                break
-
-        logger.info(f"Cleared {count} tasks from {queue_type.value}")
+        for entry in self._pending:
+            if entry[3] != queue_type:
+                kept.append(entry)
+                continue
+            count += 1
+            if entry[5]:
+                self._release_repo(entry[5])
+
+        heapq.heapify(kept)
+        self._pending = kept
+        self._has_room.set()
+        self._pending_counts[queue_type] = 0
+        self._add_unfinished(-count)
+
+        logger.info("Cleared %s tasks from %s", count, queue_type.value)
         return count
 
     def clear_all_queues(self) -> Dict[str, int]:
@@ -296,44 +421,12 @@ class TaskDispatcher:
     async def wait_for_completion(self, timeout: Optional[float] = None) -> bool:
         """Wait for all tasks to complete."""
         try:
-            await asyncio.wait_for(
-                self._all_tasks_done(),
-                timeout=timeout,
-            )
+            await asyncio.wait_for(self.join(), timeout=timeout)
             return True
         except asyncio.TimeoutError:
             return False
 
-    async def _all_tasks_done(self) -> None:
-        """Wait until all queues are empty."""
-        while True:
-            all_empty = all(q.empty() for q in self.queues.values())
-            all_empty = all_empty and all(
-                q.empty() for q in self.repo_queues.values()
-            )
-            all_idle = all(w.current_task is None for w in self.workers.values())
-
-            if all_empty and all_idle:
-                break
-
-            await asyncio.sleep(1)
-
     def get_pending_tasks(self, limit: int = 50) -> List[Task]:
-        """Get pending tasks across all queues."""
-        tasks = []
-
-        for queue_type in QueueType:
-            q = self.queues[queue_type]
-            temp_list = []
-            while not q.empty() and len(temp_list) < limit:
-                try:
-                    task = q.get_nowait()
-                    temp_list.append(task)
-                    tasks.append(task)
-                except asyncio.QueueEmpty:
-                    break
-
-            for task in temp_list:
-                q.put_nowait(task)
-
-        return tasks[:limit]
+        """Get pending tasks across all queues, most urgent first."""
+        entries = heapq.nsmallest(limit, (e for e in self._pending if e[4] is not None))
+        return [entry[4] for entry in entries]
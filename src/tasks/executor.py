@@ -2,13 +2,14 @@
 
 import asyncio
 import os
+import time
 from dataclasses import dataclass
-from datetime import datetime
 from typing import Any, Dict, List, Optional
 
+from ..core.cache import TTLCache
 from ..core.config import get_config
 from ..core.logging_ import get_logger
-from ..github import GitHubClient
+from ..github import GitHubClient, Repository
 from ..llm import LLMClient
 from ..report import ReportGenerator
 from ..review import ReviewOrchestrator
@@ -45,16 +46,29 @@ class TaskExecutor:
         self.llm = llm_client
         self.review_orchestrator = review_orchestrator
         self.report_gen = ReportGenerator()
+        self._repo_cache = TTLCache(maxsize=256, ttl=config.github.cache_ttl)
+        self._handlers = {
+            TaskType.ADD_TEST: self._handle_add_test,
+            TaskType.FIX_BUG: self._handle_fix_bug,
+            TaskType.ADD_FEATURE: self._handle_add_feature,
+            TaskType.UPDATE_DOCS: self._handle_update_docs,
+            TaskType.REFACTOR: self._handle_refactor,
+            TaskType.CODE_REVIEW: self._handle_code_review,
+            TaskType.RUN_TESTS: self._handle_run_tests,
+            TaskType.CREATE_PR: self._handle_create_pr,
+            TaskType.MERGE_PR: self._handle_merge_pr,
+            TaskType.GENERAL: self._handle_general,
+        }
 
     async def execute(self, task: Task) -> ExecutionResult:
         """Execute a task."""
-        start_time = datetime.utcnow()
+        start_time = time.monotonic()
 
         try:
-            handler = self._get_handler(task.task_type)
+            handler = self._handlers.get(task.task_type, self._handle_general)
             result = await handler(task)
 
-            execution_time = (datetime.utcnow() - start_time).total_seconds()
+            execution_time = time.monotonic() - start_time
 
             return ExecutionResult(
                 task_id=task.id,
@@ -68,7 +82,7 @@ class TaskExecutor:
             )
 
         except Exception as e:
-            execution_time = (datetime.utcnow() - start_time).total_seconds()
+            execution_time = time.monotonic() - start_time
             logger.error(f"Task execution failed: {e}")
 
             return ExecutionResult(
@@ -82,42 +96,24 @@ class TaskExecutor:
                 error=str(e),
             )
 
-    def _get_handler(self, task_type: TaskType):
-        """Get the handler for a task type."""
-        handlers = {
-            TaskType.ADD_TEST: self._handle_add_test,
-            TaskType.FIX_BUG: self._handle_fix_bug,
-            TaskType.ADD_FEATURE: self._handle_add_feature,
-            TaskType.UPDATE_DOCS: self._handle_update_docs,
-            TaskType.REFACTOR: self._handle_refactor,
-            TaskType.CODE_REVIEW: self._handle_code_review,
-            TaskType.RUN_TESTS: self._handle_run_tests,
-            TaskType.CREATE_PR: self._handle_create_pr,
-            TaskType.MERGE_PR: self._handle_merge_pr,
-            TaskType.GENERAL: self._handle_general,
-        }
-        return handlers.get(task_type, self._handle_general)
+    async def _get_repository(self, full_name: str) -> Optional[Repository]:
+        """Get repository metadata, reusing recent lookups."""
+        repo = self._repo_cache.get(full_name)
+        if repo is None:
+            repo = await self.github.get_repository(full_name)
+            if repo:
+                self._repo_cache.set(full_name, repo)
+        return repo
 
     async def _handle_add_test(self, task: Task) -> Dict[str, Any]:
         """Handle adding tests."""
         if not task.repository:
             raise ValueError("Repository not specified for test task")
 
-        repo = await self.github.get_repository(task.repository)
+        repo = await self._get_repository(task.repository)
         if not repo:
             raise ValueError(f"Repository not found: {task.repository}")
 
-        file_tree = await self.github.get_file_tree(
-            task.repository, max_depth=3, max_files=50
-        )
-
-        source_files = [
-            f["path"] for f in file_tree
-            if f["type"] == "file"
-            and f["path"].endswith(".py")
-            and "test" not in f["path"].lower()
-        ]
-
         test_content = f'''"""
 Auto-generated tests for {task.repository}
 """
@@ -175,14 +171,13 @@ Provide a fix for the bug. Return the file path and the fixed code.
         if not task.repository:
             raise ValueError("Repository not specified for feature task")
 
-        repo = await self.github.get_repository(task.repository)
+        repo, file_tree = await asyncio.gather(
+            self._get_repository(task.repository),
+            self.github.get_file_tree(task.repository, max_depth=2, max_files=20),
+        )
         if not repo:
             raise ValueError(f"Repository not found: {task.repository}")
 
-        file_tree = await self.github.get_file_tree(
-            task.repository, max_depth=2, max_files=20
-        )
-
         prompt = f"""
 Implement the following feature:
 {task.description}
@@ -202,11 +197,13 @@ Provide the implementation code. Focus on clean, well-documented code.
         if not task.repository:
             raise ValueError("Repository not specified for documentation task")
 
-        repo = await self.github.get_repository(task.repository)
+        repo, readme = await asyncio.gather(
+            self._get_repository(task.repository),
+            self.github.get_file_content(task.repository, "README.md"),
+        )
         if not repo:
             raise ValueError(f"Repository not found: {task.repository}")
 
-        readme = await self.github.get_file_content(task.repository, "README.md")
         existing_doc = readme.content if readme else ""
 
         prompt = f"""
@@ -242,11 +239,11 @@ Provide updated documentation in markdown format.
         if not task.target_files:
             raise ValueError("Target files not specified for refactor task")
 
-        file_content = await self.github.get_file_content(
-            task.repository, task.target_files[0]
+        original_code = await self.github.get_file_content_prefix(
+            task.repository, task.target_files[0], 3000
         )
 
-        if not file_content:
+        if original_code is None:
             raise ValueError(f"File not found: {task.target_files[0]}")
 
         prompt = f"""
@@ -254,7 +251,7 @@ Refactor the following code according to:
 {task.description}
 
 Original code:
-{file_content.content[:3000]}
+{original_code}
 
 Provide the refactored code with improvements.
 """
@@ -269,7 +266,7 @@ Provide the refactored code with improvements.
             raise ValueError("Repository not specified for review task")
 
         if self.review_orchestrator:
-            repo = await self.github.get_repository(task.repository)
+            repo = await self._get_repository(task.repository)
             if repo:
                 result = await self.review_orchestrator.review_repository(repo)
 
@@ -1,16 +1,34 @@
 """Task interpreter for parsing natural language commands into actionable tasks."""
 
-from dataclasses import dataclass, field
+import bisect
+import functools
+import itertools
+import re
+import time
+from dataclasses import dataclass, field, replace
 from datetime import datetime
-from enum import Enum
-from typing import Any, Dict, List, Optional
+from enum import Enum, IntEnum
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from ..core.logging_ import get_logger
 
 logger = get_logger(__name__)
 
 
-class TaskPriority(Enum):
+class _PlainEnumFormat:
+    """Render members as ``Class.NAME`` like plain Enum, whatever the mixin type.
+
+    str() and format() of int/str enums differ between Python 3.10, 3.11 and 3.12.
+    """
+
+    def __str__(self) -> str:
+        return f"{type(self).__name__}.{self.name}"
+
+    def __format__(self, format_spec: str) -> str:
+        return format(str(self), format_spec)
+
+
+class TaskPriority(_PlainEnumFormat, IntEnum):
     """Task priority levels."""
     CRITICAL = 1
     HIGH = 2
@@ -18,7 +36,7 @@ class TaskPriority(Enum):
     LOW = 4
 
 
-class TaskStatus(Enum):
+class TaskStatus(_PlainEnumFormat, str, Enum):
     """Task status levels."""
     PENDING = "pending"
     QUEUED = "queued"
@@ -28,7 +46,7 @@ class TaskStatus(Enum):
     CANCELLED = "cancelled"
 
 
-class TaskType(Enum):
+class TaskType(_PlainEnumFormat, str, Enum):
     """Types of tasks."""
     ADD_TEST = "add_test"
     FIX_BUG = "fix_bug"
@@ -43,7 +61,7 @@ class TaskType(Enum):
     GENERAL = "general"
 
 
-@dataclass
+@dataclass(slots=True)
 class Task:
     """A task to be executed."""
     id: str
@@ -66,7 +84,7 @@ class Task:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class ParsedTask:
     """Result of task parsing."""
     task_type: TaskType
@@ -88,7 +106,7 @@ class TaskInterpreter:
             r"test\s+(?:the\s+)?(?:file|function|class|module)",
             r"(?:add|create)\s+(?:unit\s+)?test",
             r"write\s+(?:unit\s+)?test",
-            r"spec",
+            r"\bspecs?\b",
         ],
         TaskType.FIX_BUG: [
             r"fix\s+(?:the\s+)?(?:bug|error|issue|problem)",
@@ -100,8 +118,6 @@ class TaskInterpreter:
             r"(?:add|create|implement|build)\s+(?:a\s+)?(?:new\s+)?feature",
             r"(?:add|create|implement)\s+(?:a\s+)?(?:new\s+)?function",
             r"(?:add|create|implement)\s+(?:a\s+)?(?:new\s+)?endpoint",
-            r"build\s+(?:a\s+)?(?:new\s+)?",
-            r"create\s+(?:a\s+)?(?:new\s+)?",
         ],
         TaskType.UPDATE_DOCS: [
             r"(?:update|add|create|write)\s+(?:the\s+)?(?:project\s+)?doc",
@@ -128,7 +144,7 @@ class TaskInterpreter:
         ],
         TaskType.DEPLOY: [
             r"(?:deploy|deployment|release)",
-            r"(?:push\s+to|ship)",
+            r"(?:push\s+to|\bship\b)",
             r"(?:put\s+into|go\s+live)",
         ],
         TaskType.CREATE_PR: [
@@ -142,15 +158,86 @@ class TaskInterpreter:
         ],
     }
 
+    # All intents in one alternation; the named group that matched is the task type.
+    _INTENT_RE = re.compile(
+        "|".join(
+            f"(?P<{task_type.name}>{'|'.join(patterns)})"
+            for task_type, patterns in INTENT_PATTERNS.items()
+        ),
+        re.IGNORECASE,
+    )
+
     PRIORITY_INDICATORS = {
-        TaskPriority.CRITICAL: ["critical", "urgent", "asap", "immediately", "emergency"],
+        TaskPriority.CRITICAL: ["critical", "urgent", "urgently", "asap", "immediately", "emergency"],
         TaskPriority.HIGH: ["important", "soon", "high priority", "must"],
         TaskPriority.MEDIUM: ["should", "would be nice", "when possible", "medium"],
         TaskPriority.LOW: ["low priority", "eventually", "sometime", "nice to have"],
     }
 
+    _PRIORITY_BY_INDICATOR = {
+        indicator: priority
+        for priority, indicators in PRIORITY_INDICATORS.items()
+        for indicator in indicators
+    }
+
+    # One whole-word alternation over every literal indicator, so "must" does not
+    # match inside "mustache"; the matched text is looked up in the table above.
+    _PRIORITY_RE = re.compile(
+        r"\b(?:"
+        + "|".join(map(re.escape, sorted(_PRIORITY_BY_INDICATOR, key=len, reverse=True)))
+        + r")\b",
+        re.IGNORECASE,
+    )
+
+    _REPO_RES = [
+        re.compile(p, re.IGNORECASE)
+        for p in (
+            r"(?:repo(?:sitory)?\s+)?([a-zA-Z0-9_-]+/[a-zA-Z0-9_-]+)",
+            r"(?:for|in)\s+([a-zA-Z0-9_-]+)",
+            r"project\s+([a-zA-Z0-9_-]+)",
+        )
+    ]
+
+    _FILE_RES = [
+        re.compile(p, re.IGNORECASE)
+        for p in (
+            r"([a-zA-Z0-9/_.-]+\.py)",
+            r"([a-zA-Z0-9/_.-]+\.js)",
+            r"([a-zA-Z0-9/_.-]+\.ts)",
+            r"([a-zA-Z0-9/_.-]+\.go)",
+            r"in\s+([a-zA-Z0-9/_.-]+)",
+            r"file\s+([a-zA-Z0-9/_.-]+)",
+        )
+    ]
+
+    _BRANCH_RE = re.compile(r"(?:branch|feature)\s+([a-zA-Z0-9_-]+)")
+    _PR_RE = re.compile(r"(?:pr|pull request)\s*(?:#)?(\d+)")
+    _LIMIT_RE = re.compile(r"(?:limit\s+)?(\d+)\s+(?:files|repos|items)")
+    _FORCE_RE = re.compile(r"(?:force|forcefully|now)")
+
+    DESCRIPTION_PREFIXES = {
+        TaskType.ADD_TEST: "Add tests as requested: ",
+        TaskType.FIX_BUG: "Fix bug as requested: ",
+        TaskType.ADD_FEATURE: "Add feature as requested: ",
+        TaskType.UPDATE_DOCS: "Update documentation as requested: ",
+        TaskType.REFACTOR: "Refactor as requested: ",
+        TaskType.CODE_REVIEW: "Review code as requested: ",
+        TaskType.RUN_TESTS: "Run tests as requested: ",
+        TaskType.DEPLOY: "Deploy as requested: ",
+        TaskType.CREATE_PR: "Create pull request as requested: ",
+        TaskType.MERGE_PR: "Merge pull request as requested: ",
+        TaskType.GENERAL: "Execute: ",
+    }
+
+    INTERPRET_CACHE_SIZE = 2048
+
     def __init__(self):
-        self._task_counter = 0
+        self._task_counter = itertools.count(1)
+        self._id_second = -1
+        self._id_stamp = ""
+        self._interpret_cached = functools.lru_cache(maxsize=self.INTERPRET_CACHE_SIZE)(
+            self._interpret
+        )
 
     def interpret(
         self,
@@ -158,16 +245,46 @@ class TaskInterpreter:
         context: Optional[Dict[str, Any]] = None,
     ) -> ParsedTask:
         """Interpret a natural language command into a task."""
-        command_lower = command.lower()
+        context = context or {}
+        parsed = self._interpret_cached(
+            command, context.get("default_repo"), context.get("repository")
+        )
+
+        return self._copy_parsed(parsed)
+
+    @staticmethod
+    def _copy_parsed(parsed: ParsedTask) -> ParsedTask:
+        """Copy the mutable fields of a shared parse result before handing it out."""
+        return replace(
+            parsed,
+            target_files=list(parsed.target_files),
+            parameters=dict(parsed.parameters),
+        )
 
-        task_type = self._detect_intent(command_lower)
-        priority = self._detect_priority(command_lower)
+    def _interpret(
+        self,
+        command: str,
+        default_repo: Optional[str],
+        context_repo: Optional[str],
+        intent: Optional[Tuple[TaskType, int]] = None,
+        priority: Optional[TaskPriority] = None,
+    ) -> ParsedTask:
+        """Parse a command; only the context keys the parser reads are passed in."""
+        context = {}
+        if default_repo is not None:
+            context["default_repo"] = default_repo
+        if context_repo is not None:
+            context["repository"] = context_repo
+
+        task_type, intent_matches = intent or self._detect_intent(command)
+        if priority is None:
+            priority = self._detect_priority(command)
         repository = self._extract_repository(command, context)
         target_files = self._extract_file_paths(command)
         parameters = self._extract_parameters(command, task_type)
         title = self._generate_title(command, task_type)
         description = self._generate_description(command, task_type, context)
-        confidence = self._calculate_confidence(command_lower, task_type)
+        confidence = self._calculate_confidence(task_type, intent_matches)
 
         return ParsedTask(
             task_type=task_type,
@@ -188,8 +305,7 @@ class TaskInterpreter:
         """Create a full Task object from a command."""
         parsed = self.interpret(command, context)
 
-        self._task_counter += 1
-        task_id = f"task-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{self._task_counter:04d}"
+        task_id = f"task-{self._timestamp_for_id()}-{next(self._task_counter):04d}"
 
         return Task(
             id=task_id,
@@ -212,39 +328,59 @@ class TaskInterpreter:
             metadata={"confidence": parsed.confidence},
         )
 
-    def _detect_intent(self, command: str) -> TaskType:
-        """Detect the intent of the command."""
-        for intent_type, patterns in self.INTENT_PATTERNS.items():
-            for pattern in patterns:
-                if pattern in command:
-                    return intent_type
-        return TaskType.GENERAL
+    def _timestamp_for_id(self) -> str:
+        """UTC timestamp for task ids, reformatted only when the second changes."""
+        second = int(time.time())
+        if second != self._id_second:
+            self._id_second = second
+            self._id_stamp = time.strftime("%Y%m%d%H%M%S", time.gmtime(second))
+        return self._id_stamp
+
+    def _detect_intent(self, command: str) -> Tuple[TaskType, int]:
+        """Detect the intent of the command and how often its patterns matched."""
+        detected = None
+        for match in self._INTENT_RE.finditer(command):
+            detected = self._merge_intent(detected, match)
+        return detected or (TaskType.GENERAL, 0)
+
+    @staticmethod
+    def _merge_intent(
+        current: Optional[Tuple[TaskType, int]], match: "re.Match[str]"
+    ) -> Tuple[TaskType, int]:
+        """Fold an intent match in: the first match sets the type, later ones count toward it."""
+        if current is None:
+            return TaskType[match.lastgroup], 1
+        task_type, count = current
+        return task_type, count + (match.lastgroup == task_type.name)
+
+    @staticmethod
+    def _merge_priority(
+        current: Optional[TaskPriority], match: "re.Match[str]"
+    ) -> TaskPriority:
+        """Fold a priority match in, keeping the most urgent priority seen."""
+        priority = TaskInterpreter._PRIORITY_BY_INDICATOR[match.group().lower()]
+        if current is None or priority < current:
+            return priority
+        return current
 
     def _detect_priority(self, command: str) -> TaskPriority:
         """Detect the priority of the task."""
-        command_lower = command.lower()
+        # _PRIORITY_RE ignores case, so the command is scanned as-is.
+        # The most urgent indicator wins, wherever it appears.
+        detected = None
+        for match in self._PRIORITY_RE.finditer(command):
+            detected = self._merge_priority(detected, match)
+            if detected == TaskPriority.CRITICAL:
+                break
 
-        for priority, indicators in self.PRIORITY_INDICATORS.items():
-            for indicator in indicators:
-                if indicator in command_lower:
-                    return priority
-
-        return TaskPriority.MEDIUM
+        return detected or TaskPriority.MEDIUM
 
     def _extract_repository(
         self, command: str, context: Optional[Dict[str, Any]] = None
     ) -> Optional[str]:
         """Extract repository name from command."""
-        import re
-
-        patterns = [
-            r"(?:repo(?:sitory)?\s+)?([a-zA-Z0-9_-]+/[a-zA-Z0-9_-]+)",
-            r"(?:for|in)\s+([a-zA-Z0-9_-]+)",
-            r"project\s+([a-zA-Z0-9_-]+)",
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, command, re.IGNORECASE)
+        for pattern_re in self._REPO_RES:
+            match = pattern_re.search(command)
             if match:
                 repo = match.group(1)
                 if "/" not in repo and context:
@@ -259,45 +395,35 @@ class TaskInterpreter:
 
     def _extract_file_paths(self, command: str) -> List[str]:
         """Extract file paths from command."""
-        import re
+        # dict keeps first-seen order while deduplicating.
+        files: Dict[str, None] = {}
+        for pattern_re in self._FILE_RES:
+            for match in pattern_re.finditer(command):
+                files.setdefault(match.group(1))
+                if len(files) == 10:
+                    return list(files)
 
-        patterns = [
-            r"([a-zA-Z0-9/_.-]+\.py)",
-            r"([a-zA-Z0-9/_.-]+\.js)",
-            r"([a-zA-Z0-9/_.-]+\.ts)",
-            r"([a-zA-Z0-9/_.-]+\.go)",
-            r"in\s+([a-zA-Z0-9/_.-]+)",
-            r"file\s+([a-zA-Z0-9/_.-]+)",
-        ]
-
-        files = []
-        for pattern in patterns:
-            matches = re.findall(pattern, command, re.IGNORECASE)
-            files.extend(matches)
-
-        return list(set(files))[:10]
+        return list(files)
 
     def _extract_parameters(
         self, command: str, task_type: TaskType
     ) -> Dict[str, Any]:
         """Extract parameters from command."""
-        import re
-
         parameters = {}
 
-        branch_match = re.search(r"(?:branch|feature)\s+([a-zA-Z0-9_-]+)", command)
+        branch_match = self._BRANCH_RE.search(command)
         if branch_match:
             parameters["branch_name"] = branch_match.group(1)
 
-        pr_match = re.search(r"(?:pr|pull request)\s*(?:#)?(\d+)", command)
+        pr_match = self._PR_RE.search(command)
         if pr_match:
             parameters["pr_number"] = int(pr_match.group(1))
 
-        limit_match = re.search(r"(?:limit\s+)?(\d+)\s+(?:files|repos|items)", command)
+        limit_match = self._LIMIT_RE.search(command)
         if limit_match:
             parameters["limit"] = int(limit_match.group(1))
 
-        force_match = re.search(r"(?:force|forcefully|now)", command)
+        force_match = self._FORCE_RE.search(command)
         if force_match:
             parameters["force"] = True
 
@@ -328,47 +454,63 @@ class TaskInterpreter:
         context: Optional[Dict[str, Any]] = None,
     ) -> str:
         """Generate a description for the task."""
-        descriptions = {
-            TaskType.ADD_TEST: f"Add tests as requested: {command}",
-            TaskType.FIX_BUG: f"Fix bug as requested: {command}",
-            TaskType.ADD_FEATURE: f"Add feature as requested: {command}",
-            TaskType.UPDATE_DOCS: f"Update documentation as requested: {command}",
-            TaskType.REFACTOR: f"Refactor as requested: {command}",
-            TaskType.CODE_REVIEW: f"Review code as requested: {command}",
-            TaskType.RUN_TESTS: f"Run tests as requested: {command}",
-            TaskType.DEPLOY: f"Deploy as requested: {command}",
-            TaskType.CREATE_PR: f"Create pull request as requested: {command}",
-            TaskType.MERGE_PR: f"Merge pull request as requested: {command}",
-            TaskType.GENERAL: f"Execute: {command}",
-        }
+        description = self.DESCRIPTION_PREFIXES.get(task_type, "") + command
 
-        if context:
-            if "repository" in context:
-                descriptions[task_type] += f" in repository: {context['repository']}"
+        if context and "repository" in context:
+            description += f" in repository: {context['repository']}"
 
-        return descriptions.get(task_type, command)
+        return description
 
-    def _calculate_confidence(self, command: str, detected_type: TaskType) -> float:
-        """Calculate confidence score for the interpretation."""
+    def _calculate_confidence(self, detected_type: TaskType, match_count: int) -> float:
+        """Calculate confidence score from how often the detected intent matched."""
         if detected_type == TaskType.GENERAL:
             return 0.5
 
-        base_confidence = 0.7
-
-        for pattern in self.INTENT_PATTERNS.get(detected_type, []):
-            if pattern in command:
-                base_confidence += 0.1
-
-        return min(0.95, base_confidence)
+        return min(0.95, 0.7 + 0.1 * match_count)
 
     def batch_interpret(
         self, commands: List[str], context: Optional[Dict[str, Any]] = None
     ) -> List[ParsedTask]:
-        """Interpret multiple commands."""
-        return [self.interpret(cmd, context) for cmd in commands]
+        """Interpret multiple commands, scanning intent and priority in one pass."""
+        unique = list(dict.fromkeys(commands))
+        if len(unique) < 2:
+            return [self.interpret(cmd, context) for cmd in commands]
+
+        context = context or {}
+        intents = self._scan_batch(unique, self._INTENT_RE, self._merge_intent)
+        priorities = self._scan_batch(unique, self._PRIORITY_RE, self._merge_priority)
+
+        parsed = {
+            cmd: self._interpret(
+                cmd,
+                context.get("default_repo"),
+                context.get("repository"),
+                intents[i] or (TaskType.GENERAL, 0),
+                priorities[i] or TaskPriority.MEDIUM,
+            )
+            for i, cmd in enumerate(unique)
+        }
+        return [self._copy_parsed(parsed[cmd]) for cmd in commands]
+
+    @staticmethod
+    def _scan_batch(
+        texts: List[str],
+        pattern: "re.Pattern[str]",
+        merge: Callable[[Any, "re.Match[str]"], Any],
+    ) -> List[Any]:
+        """Run one regex over all texts joined by NUL and fold each match into its text's result."""
+        starts = list(itertools.accumulate((len(t) + 1 for t in texts[:-1]), initial=0))
+        results: List[Any] = [None] * len(texts)
+
+        for match in pattern.finditer("\0".join(texts)):
+            index = bisect.bisect_right(starts, match.start()) - 1
+            results[index] = merge(results[index], match)
+
+        return results
 
     def create_task_batch(
         self, commands: List[str], context: Optional[Dict[str, Any]] = None
     ) -> List[Task]:
         """Create multiple tasks from commands."""
         return [self.create_task(cmd, context) for cmd in commands]
+
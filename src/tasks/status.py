@@ -1,10 +1,20 @@
 """Task status tracking and history management."""
 
+import atexit
+import heapq
 import json
+import queue
+import threading
+from collections import defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from ..core.config import get_config
 from ..core.logging_ import get_logger
@@ -14,8 +24,25 @@ logger = get_logger(__name__)
 
 config = get_config()
 
+ACTIVE_STATUSES = (TaskStatus.PENDING, TaskStatus.QUEUED, TaskStatus.IN_PROGRESS)
+FINISHED_STATUSES = (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED)
+
+# Lines kept in the JSON Lines storage files.
+HISTORY_LIMIT = 500
+COMPLETED_TASKS_LIMIT = 100
+
+# Most queued writes the background writer handles before flushing.
+IO_BATCH_SIZE = 256
+
 
-@dataclass
+def _dumps_line(record: Dict[str, Any]) -> str:
+    """Serialize a record as one compact JSON line, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE).decode()
+    return json.dumps(record, separators=(",", ":")) + "\n"
+
+
+@dataclass(slots=True)
 class TaskHistoryEntry:
     """An entry in the task history."""
     timestamp: datetime
@@ -25,7 +52,7 @@ class TaskHistoryEntry:
     user: Optional[str]
 
 
-@dataclass
+@dataclass(slots=True)
 class TaskMetrics:
     """Metrics for task execution."""
     total_tasks: int = 0
@@ -43,9 +70,24 @@ class TaskStatusTracker:
 
     def __init__(self, storage_path: Optional[str] = None):
         self.storage_path = storage_path or "data/task_history.json"
+        self._storage_dir = Path(self.storage_path).parent
         self._ensure_storage()
+        self._handles: Dict[str, TextIO] = {}
+        self._line_counts: Dict[str, int] = {}
+        # Storage writes run on a background thread; items are (filename, record, keep).
+        self._io_queue: "queue.Queue[Optional[Tuple[str, Dict[str, Any], int]]]" = queue.Queue()
+        self._io_thread: Optional[threading.Thread] = None
         self.active_tasks: Dict[str, Task] = {}
         self.history: List[TaskHistoryEntry] = []
+        # Seconds from start to completion for each completed active task.
+        self._completion_times: Dict[str, float] = {}
+        # Task ids per status, type, priority and repository (dicts used as ordered sets).
+        self._by_status: Dict[TaskStatus, Dict[str, None]] = defaultdict(dict)
+        # Status each task is filed under; the dispatcher may assign task.status directly.
+        self._indexed_status: Dict[str, TaskStatus] = {}
+        self._by_type: Dict[TaskType, Dict[str, None]] = defaultdict(dict)
+        self._by_priority: Dict[TaskPriority, Dict[str, None]] = defaultdict(dict)
+        self._by_repo: Dict[Optional[str], Dict[str, None]] = defaultdict(dict)
 
     def _ensure_storage(self) -> None:
         """Ensure storage directory exists."""
@@ -53,7 +95,10 @@ class TaskStatusTracker:
 
     def register_task(self, task: Task) -> None:
         """Register a new task."""
+        if task.id in self.active_tasks:
+            self._unindex(self.active_tasks[task.id])
         self.active_tasks[task.id] = task
+        self._index(task)
         self._add_history(task.id, "created", f"Task created: {task.title}")
 
         logger.info(f"Registered task: {task.id}")
@@ -72,7 +117,8 @@ class TaskStatusTracker:
 
         task = self.active_tasks[task_id]
         old_status = task.status
-        task.status = status
+        self._set_status(task, status)
+        self._completion_times.pop(task_id, None)
 
         if status == TaskStatus.IN_PROGRESS:
             task.started_at = datetime.utcnow()
@@ -81,6 +127,10 @@ class TaskStatusTracker:
         elif status == TaskStatus.COMPLETED:
             task.completed_at = datetime.utcnow()
             task.result = result
+            if task.started_at:
+                self._completion_times[task_id] = (
+                    task.completed_at - task.started_at
+                ).total_seconds()
             self._add_history(task_id, "completed", details or f"Task completed: {task.title}")
             self._save_task(task)
 
@@ -97,48 +147,69 @@ class TaskStatusTracker:
         logger.info(f"Task {task_id} status: {old_status.value} -> {status.value}")
         return True
 
+    def _index(self, task: Task) -> None:
+        """Add a task to the lookup indexes."""
+        self._by_status[task.status][task.id] = None
+        self._indexed_status[task.id] = task.status
+        self._by_type[task.task_type][task.id] = None
+        self._by_priority[task.priority][task.id] = None
+        self._by_repo[task.repository][task.id] = None
+
+    def _unindex(self, task: Task) -> None:
+        """Remove a task from the lookup indexes."""
+        self._by_status[self._indexed_status.pop(task.id)].pop(task.id, None)
+        self._by_type[task.task_type].pop(task.id, None)
+        self._by_priority[task.priority].pop(task.id, None)
+        self._by_repo[task.repository].pop(task.id, None)
+
+    def _set_status(self, task: Task, status: TaskStatus) -> None:
+        """Change a task's status and move it between status indexes."""
+        self._by_status[self._indexed_status[task.id]].pop(task.id, None)
+        task.status = status
+        self._by_status[status][task.id] = None
+        self._indexed_status[task.id] = status
+
+    def _lookup(self, index: Dict[Any, Dict[str, None]], key: Any) -> List[Task]:
+        """Resolve the task ids stored under an index key."""
+        return [self.active_tasks[task_id] for task_id in index.get(key, ())]
+
     def get_task(self, task_id: str) -> Optional[Task]:
         """Get a task by ID."""
         return self.active_tasks.get(task_id)
 
     def get_tasks_by_status(self, status: TaskStatus) -> List[Task]:
         """Get all tasks with a specific status."""
-        return [t for t in self.active_tasks.values() if t.status == status]
+        return self._lookup(self._by_status, status)
 
     def get_tasks_by_repository(self, repo: str) -> List[Task]:
         """Get all tasks for a specific repository."""
-        return [t for t in self.active_tasks.values() if t.repository == repo]
+        return self._lookup(self._by_repo, repo)
 
     def get_tasks_by_type(self, task_type: TaskType) -> List[Task]:
         """Get all tasks of a specific type."""
-        return [t for t in self.active_tasks.values() if t.task_type == task_type]
+        return self._lookup(self._by_type, task_type)
 
     def get_tasks_by_priority(self, priority: TaskPriority) -> List[Task]:
         """Get all tasks with a specific priority."""
-        return [t for t in self.active_tasks.values() if t.priority == priority]
+        return self._lookup(self._by_priority, priority)
 
     def get_active_tasks(self) -> List[Task]:
         """Get all active (non-completed) tasks."""
         return [
-            t for t in self.active_tasks.values()
-            if t.status not in [TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED]
+            task
+            for status in ACTIVE_STATUSES
+            for task in self._lookup(self._by_status, status)
         ]
 
     def get_completed_tasks(self, limit: int = 100) -> List[Task]:
         """Get completed tasks."""
-        completed = [
-            t for t in self.active_tasks.values()
-            if t.status == TaskStatus.COMPLETED
-        ]
-        return sorted(completed, key=lambda t: t.completed_at or datetime.min, reverse=True)[:limit]
+        completed = self._lookup(self._by_status, TaskStatus.COMPLETED)
+        return heapq.nlargest(limit, completed, key=lambda t: t.completed_at or datetime.min)
 
     def get_failed_tasks(self, limit: int = 50) -> List[Task]:
         """Get failed tasks."""
-        failed = [
-            t for t in self.active_tasks.values()
-            if t.status == TaskStatus.FAILED
-        ]
-        return sorted(failed, key=lambda t: t.completed_at or datetime.min, reverse=True)[:limit]
+        failed = self._lookup(self._by_status, TaskStatus.FAILED)
+        return heapq.nlargest(limit, failed, key=lambda t: t.completed_at or datetime.min)
 
     def cancel_task(self, task_id: str, reason: str = "Cancelled by user") -> bool:
         """Cancel a task."""
@@ -154,7 +225,7 @@ class TaskStatusTracker:
             return False
 
         task.retries += 1
-        task.status = TaskStatus.PENDING
+        self._set_status(task, TaskStatus.PENDING)
         task.error = None
         task.started_at = None
         task.completed_at = None
@@ -182,42 +253,28 @@ class TaskStatusTracker:
 
     def get_metrics(self) -> TaskMetrics:
         """Calculate task metrics."""
-        tasks = list(self.active_tasks.values())
+        total = len(self.active_tasks)
 
-        if not tasks:
+        if not total:
             return TaskMetrics()
 
-        completed = [t for t in tasks if t.status == TaskStatus.COMPLETED]
-        failed = [t for t in tasks if t.status == TaskStatus.FAILED]
-        pending = [t for t in tasks if t.status in [TaskStatus.PENDING, TaskStatus.QUEUED, TaskStatus.IN_PROGRESS]]
-
-        completion_times = []
-        for t in completed:
-            if t.started_at and t.completed_at:
-                duration = (t.completed_at - t.started_at).total_seconds()
-                completion_times.append(duration)
-
-        avg_time = sum(completion_times) / len(completion_times) if completion_times else 0.0
-        success_rate = len(completed) / len(tasks) * 100 if tasks else 0.0
+        by_status = self._by_status
+        completed = len(by_status.get(TaskStatus.COMPLETED, ()))
+        failed = len(by_status.get(TaskStatus.FAILED, ()))
+        pending = sum(len(by_status.get(status, ())) for status in ACTIVE_STATUSES)
 
-        by_type = {}
-        by_priority = {}
-        for t in tasks:
-            ttype = t.task_type.value
-            by_type[ttype] = by_type.get(ttype, 0) + 1
-
-            pname = t.priority.name
-            by_priority[pname] = by_priority.get(pname, 0) + 1
+        times = self._completion_times
+        avg_time = sum(times.values()) / len(times) if times else 0.0
 
         return TaskMetrics(
-            total_tasks=len(tasks),
-            completed_tasks=len(completed),
-            failed_tasks=len(failed),
-            pending_tasks=len(pending),
+            total_tasks=total,
+            completed_tasks=completed,
+            failed_tasks=failed,
+            pending_tasks=pending,
             avg_completion_time=avg_time,
-            success_rate=success_rate,
-            by_type=by_type,
-            by_priority=by_priority,
+            success_rate=completed / total * 100,
+            by_type={t.value: len(ids) for t, ids in self._by_type.items() if ids},
+            by_priority={p.name: len(ids) for p, ids in self._by_priority.items() if ids},
         )
 
     def get_history(
@@ -231,7 +288,7 @@ class TaskStatusTracker:
         else:
             history = self.history
 
-        return sorted(history, key=lambda h: h.timestamp, reverse=True)[:limit]
+        return heapq.nlargest(limit, history, key=lambda h: h.timestamp)
 
     def _add_history(
         self, task_id: str, action: str, details: str, user: Optional[str] = None
@@ -245,19 +302,13 @@ class TaskStatusTracker:
             user=user,
         )
         self.history.append(entry)
-        self._save_history()
+        self._save_history(entry)
 
     def _save_task(self, task: Task) -> None:
         """Save a completed task to storage."""
-        try:
-            storage_file = Path(self.storage_path).parent / "completed_tasks.json"
-
-            completed = []
-            if storage_file.exists():
-                with open(storage_file, "r") as f:
-                    completed = json.load(f)
-
-            completed.append({
+        self._append_record(
+            "completed_tasks.jsonl",
+            {
                 "id": task.id,
                 "title": task.title,
                 "description": task.description,
@@ -269,35 +320,139 @@ class TaskStatusTracker:
                 "completed_at": task.completed_at.isoformat() if task.completed_at else None,
                 "result": task.result,
                 "error": task.error,
-            })
-
-            with open(storage_file, "w") as f:
-                json.dump(completed[-100:], f, indent=2)
+            },
+            keep=COMPLETED_TASKS_LIMIT,
+        )
 
-        except Exception as e:
-            logger.error(f"Failed to save task: {e}")
+    def _save_history(self, entry: TaskHistoryEntry) -> None:
+        """Save a history entry to storage."""
+        self._append_record(
+            "task_history.jsonl",
+            {
+                "timestamp": entry.timestamp.isoformat(),
+                "task_id": entry.task_id,
+                "action": entry.action,
+                "details": entry.details,
+                "user": entry.user,
+            },
+            keep=HISTORY_LIMIT,
+        )
 
-    def _save_history(self) -> None:
-        """Save history to storage."""
+    def _append_record(self, filename: str, record: Dict[str, Any], keep: int) -> None:
+        """Queue a record for the background writer, starting it if needed."""
+        if self._io_thread is None:
+            self._io_thread = threading.Thread(
+                target=self._io_worker, name="task-status-writer", daemon=True
+            )
+            self._io_thread.start()
+            # The writer is a daemon thread; flush whatever is still queued at exit.
+            atexit.register(self.close)
+        self._io_queue.put((filename, record, keep))
+
+    def _io_worker(self) -> None:
+        """Write queued records in batches until a None sentinel arrives."""
+        while True:
+            batch = [self._io_queue.get()]
+            while len(batch) < IO_BATCH_SIZE:
+                try:
+                    batch.append(self._io_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for item in batch:
+                if item is not None:
+                    self._write_record(*item)
+
+            for handle in self._handles.values():
+                handle.flush()
+
+            if None in batch:
+                return
+
+    def _write_record(self, filename: str, record: Dict[str, Any], keep: int) -> None:
+        """Append one JSON line to a storage file, trimming it to keep lines now and then."""
         try:
-            storage_file = Path(self.storage_path).parent / "task_history.json"
-
-            history_data = [
-                {
-                    "timestamp": h.timestamp.isoformat(),
-                    "task_id": h.task_id,
-                    "action": h.action,
-                    "details": h.details,
-                    "user": h.user,
-                }
-                for h in self.history[-500:]
-            ]
-
-            with open(storage_file, "w") as f:
-                json.dump(history_data, f, indent=2)
+            handle = self._handles.get(filename)
+            if handle is None:
+                path = self._storage_dir / filename
+                self._migrate_legacy(path)
+                self._line_counts[filename] = self._count_lines(path)
+                handle = self._handles[filename] = open(path, "a", encoding="utf-8")
+
+            handle.write(_dumps_line(record))
+            self._line_counts[filename] += 1
+
+            # Trim only once the file has doubled, so rewrites stay amortized O(1).
+            if self._line_counts[filename] >= 2 * keep:
+                self._trim_file(filename, keep)
 
         except Exception as e:
-            logger.error(f"Failed to save history: {e}")
+            logger.error(f"Failed to write {filename}: {e}")
+
+    @staticmethod
+    def _migrate_legacy(path: Path) -> None:
+        """Convert a legacy JSON array file (e.g. task_history.json) to JSON lines.
+
+        Runs only when the .jsonl file does not exist yet; the old file is kept
+        as <name>.json.bak.
+        """
+        legacy_path = path.with_suffix(".json")
+        if path.exists() or not legacy_path.exists():
+            return
+
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                records = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not migrate {legacy_path}: {e}")
+            return
+
+        if not isinstance(records, list):
+            logger.warning(f"Could not migrate {legacy_path}: expected a JSON array")
+            return
+
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(_dumps_line(record) for record in records)
+        tmp_path.replace(path)
+        legacy_path.replace(legacy_path.with_suffix(".json.bak"))
+        logger.info(f"Migrated {len(records)} records from {legacy_path} to {path}")
+
+    def _trim_file(self, filename: str, keep: int) -> None:
+        """Rewrite a storage file with only its last keep lines."""
+        self._handles.pop(filename).close()
+        path = self._storage_dir / filename
+
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.readlines()[-keep:]
+
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        tmp_path.replace(path)
+
+        self._line_counts[filename] = len(lines)
+        self._handles[filename] = open(path, "a", encoding="utf-8")
+
+    @staticmethod
+    def _count_lines(path: Path) -> int:
+        """Count lines in a file, or 0 if it does not exist."""
+        if not path.exists():
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            return sum(1 for _ in f)
+
+    def close(self) -> None:
+        """Flush pending writes and close open storage files."""
+        if self._io_thread is not None:
+            self._io_queue.put(None)
+            self._io_thread.join()
+            self._io_thread = None
+            atexit.unregister(self.close)
+
+        for handle in self._handles.values():
+            handle.close()
+        self._handles.clear()
 
     def generate_report(self) -> str:
         """Generate a text report of task status."""
@@ -333,12 +488,14 @@ class TaskStatusTracker:
     def clear_completed(self) -> int:
         """Clear completed tasks from active tracking."""
         to_remove = [
-            task_id for task_id, task in self.active_tasks.items()
-            if task.status in [TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED]
+            task_id
+            for status in FINISHED_STATUSES
+            for task_id in self._by_status.get(status, ())
         ]
 
         for task_id in to_remove:
-            del self.active_tasks[task_id]
+            self._unindex(self.active_tasks.pop(task_id))
+            self._completion_times.pop(task_id, None)
 
         logger.info(f"Cleared {len(to_remove)} completed tasks")
         return len(to_remove)
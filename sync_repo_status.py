@@ -1,18 +1,69 @@
 """Script to sync all REPO_STATUS.md files from GitHub to the database."""
 
 import asyncio
+import hashlib
+import json
 import re
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from src.core.config import get_config
 from src.core.database import Database
-from src.core.logging_ import get_logger
+from src.core.logging_ import get_logger, queued_logging
 from src.github import GitHubClient
 
 logger = get_logger(__name__)
 config = get_config()
 
+# Repositories whose status files are fetched at the same time.
+MAX_CONCURRENT_SYNCS = 8
+
+# Lines kept per section and characters of summary text examined, so a malformed
+# file without further headings cannot make a section unbounded.
+SECTION_LINE_LIMIT = 500
+SUMMARY_SCAN_CHARS = 2000
+
+# Headings that open a section, keyed by the stripped heading line.
+_SECTION_HEADINGS = {
+    "## Summary": "summary",
+    "## Stuck Area": "stuck_areas",
+    "## Stuck Areas": "stuck_areas",
+    "## Next Step": "next_steps",
+    "## Next Steps": "next_steps",
+    "## Issue Found": "issues",
+    "## Issues Found": "issues",
+}
+# Lowercased score labels; the score is the first percentage after the label on its line,
+# as in the table format: | **Overall** | `███` 0% |
+_SCORE_LABELS = {
+    "overall": "**overall**",
+    "code_quality": "code quality",
+    "documentation": "documentation",
+    "structure": "structure",
+    "testing": "testing",
+}
+# Phrases that mark a bulleted section as having nothing to list.
+_EMPTY_SECTION_MARKERS = {
+    "stuck_areas": ("no stuck areas",),
+    "next_steps": ("no specific next steps",),
+    "issues": ("no critical issues", "no issues"),
+}
+_PERCENT_RE = re.compile(r"(\d+)\s*%")
+_DATE_RE = re.compile(r"Generated:\s*(\d{4}-\d{2}-\d{2})")
+
+
+def _bullets(lines: List[str]) -> List[str]:
+    """Return the non-empty items of the bulleted lines ("- ", "* " or "• ")."""
+    items = []
+    for line in lines:
+        stripped = line.lstrip()
+        if stripped[:2] in ("- ", "* ", "• "):
+            item = stripped[2:].strip()
+            if item:
+                items.append(item)
+    return items
+
 
 def parse_repo_status(content: str) -> Dict[str, Any]:
     """Parse a REPO_STATUS.md file and extract structured data."""
@@ -29,148 +80,185 @@ def parse_repo_status(content: str) -> Dict[str, Any]:
         "last_updated": None,
     }
 
-    # Extract status from Summary section
-    summary_match = re.search(r"## Summary\s*\n(.+?)(?:\n##|$)", content, re.DOTALL)
-    if summary_match:
-        summary_text = summary_match.group(1).strip()
+    # Walk the file once, collecting section lines, scores and the generated date.
+    sections: Dict[str, List[str]] = {}
+    current: Optional[List[str]] = None
+    scores_found = set()
+    date_text = None
+
+    for line in content.splitlines():
+        if line.startswith("##"):
+            # Any ## heading closes the current section; only the first of each counts.
+            name = _SECTION_HEADINGS.get(line.rstrip())
+            current = None
+            if name and name not in sections:
+                current = sections[name] = []
+            continue
+
+        if current is not None and len(current) < SECTION_LINE_LIMIT:
+            current.append(line)
+
+        if "%" in line:
+            line_lower = line.lower()
+            for key, label in _SCORE_LABELS.items():
+                start = line_lower.find(label)
+                if start >= 0 and key not in scores_found:
+                    match = _PERCENT_RE.search(line, start + len(label))
+                    if match:
+                        result[f"{key}_score"] = int(match.group(1))
+                        scores_found.add(key)
+
+        if date_text is None and "Generated:" in line:
+            date_match = _DATE_RE.search(line)
+            if date_match:
+                date_text = date_match.group(1)
+
+    # Determine status based on summary content
+    if "summary" in sections:
+        summary_text = "\n".join(sections["summary"])[:SUMMARY_SCAN_CHARS].strip()
         result["summary"] = summary_text[:500]
-        # Determine status based on summary content
-        if "verified and updated" in summary_text.lower():
+        summary_lower = summary_text.lower()
+        if "verified and updated" in summary_lower:
             result["status"] = "completed"
-        elif "incomplete" in summary_text.lower():
+        elif "incomplete" in summary_lower:
             result["status"] = "incomplete"
-        elif "needs review" in summary_text.lower():
+        elif "needs review" in summary_lower:
             result["status"] = "needs_review"
-        elif "no issues" in summary_text.lower() or "no critical" in summary_text.lower():
+        elif "no issues" in summary_lower or "no critical" in summary_lower:
             result["status"] = "healthy"
 
-    # Extract quality scores from table format: | **Overall** | `███` 0% |
-    score_patterns = {
-        "overall": r"\*\*Overall\*\*.*?(\d+)\s*%",
-        "code_quality": r"Code Quality.*?(\d+)\s*%",
-        "documentation": r"Documentation.*?(\d+)\s*%",
-        "structure": r"Structure.*?(\d+)\s*%",
-        "testing": r"Testing.*?(\d+)\s*%",
-    }
-
-    for key, pattern in score_patterns.items():
-        match = re.search(pattern, content, re.IGNORECASE | re.DOTALL)
-        if match:
-            result[f"{key}_score"] = int(match.group(1))
-
-    # Extract stuck areas
-    stuck_section = re.search(r"## Stuck Areas?\s*\n([\s\S]*?)(?:\n##|\n\n##|$)", content)
-    if stuck_section:
-        areas_text = stuck_section.group(1)
-        if "no stuck areas" not in areas_text.lower():
-            areas = re.findall(r"[-•*]\s*(.+)", areas_text)
-            result["stuck_areas"] = [a.strip() for a in areas if a.strip()]
-
-    # Extract next steps
-    next_steps_section = re.search(r"## Next Steps?\s*\n([\s\S]*?)(?:\n##|\n\n##|$)", content)
-    if next_steps_section:
-        steps_text = next_steps_section.group(1)
-        if "no specific next steps" not in steps_text.lower():
-            steps = re.findall(r"[-•*]\s*(.+)", steps_text)
-            result["next_steps"] = [s.strip() for s in steps if s.strip()]
-
-    # Extract issues
-    issues_section = re.search(r"## Issues? Found?\s*\n([\s\S]*?)(?:\n##|\n\n##|$)", content)
-    if issues_section:
-        issues_text = issues_section.group(1)
-        if "no critical issues" not in issues_text.lower() and "no issues" not in issues_text.lower():
-            issues = re.findall(r"[-•*]\s*(.+)", issues_text)
-            result["issues"] = [i.strip() for i in issues if i.strip()]
-
-    # Extract generated date
-    date_match = re.search(r"Generated:\s*(\d{4}-\d{2}-\d{2})", content)
-    if date_match:
+    # Bulleted sections, unless they say there is nothing to list. Sections like
+    # "No stuck areas identified." have no bullets, so only sections that do
+    # have bullets need their text searched for those markers.
+    for key, markers in _EMPTY_SECTION_MARKERS.items():
+        lines = sections.get(key)
+        if not lines:
+            continue
+        items = _bullets(lines)
+        if items:
+            block_lower = "\n".join(lines).lower()
+            if not any(marker in block_lower for marker in markers):
+                result[key] = items
+
+    # Parse generated date
+    if date_text:
         try:
-            result["last_updated"] = datetime.strptime(date_match.group(1), "%Y-%m-%d")
+            result["last_updated"] = datetime.strptime(date_text, "%Y-%m-%d")
         except ValueError:
             pass
 
     return result
 
 
-async def sync_repo_status():
-    """Sync all REPO_STATUS.md files to the database."""
-    db = Database()
-    github = GitHubClient()
-
-    await db.connect()
-
-    logger.info("Fetching all repositories from GitHub...")
-    repos = await github.list_all_repositories()
-    logger.info(f"Found {len(repos)} repositories")
-
-    synced = 0
-    errors = []
-
-    for repo in repos:
-        full_name = repo.full_name
-        logger.info(f"Processing: {full_name}")
-
-        try:
-            # Get the REPO_STATUS.md file
-            status_file = await github.get_file_content(full_name, "REPO_STATUS.md")
-
-            if not status_file:
-                logger.warning(f"No REPO_STATUS.md found for {full_name}")
-                continue
-
-            # Parse the content
-            parsed = parse_repo_status(status_file.content)
+@dataclass
+class _StatusSync:
+    """Database rows prepared for one repository."""
+    full_name: str
+    parsed: Dict[str, Any]
+    repo_data: Dict[str, Any]
+    # None when the status file is unchanged since the last sync.
+    review_result: Optional[Dict[str, Any]]
+    cache_entry: Optional[Dict[str, Any]]
+
+
+async def _sync_one(
+    repo: Any,
+    db: Database,
+    github: GitHubClient,
+    now: datetime,
+) -> Optional[_StatusSync]:
+    """Fetch and parse one repository's status file, or None if it has none."""
+    full_name = repo.full_name
+    cached = await db.get_repo_status_cache(full_name)
+
+    await github.throttle.acquire()
+    logger.debug(f"Processing: {full_name}")
+    # Get the REPO_STATUS.md file; a 304 means it is unchanged since the cached ETag
+    status_code, status_file = await github.get_file_content_conditional(
+        full_name, "REPO_STATUS.md", etag=cached.etag if cached else None
+    )
+
+    if status_code == 304 and cached is not None:
+        unchanged = True
+        content_hash = cached.content_hash
+    elif status_file:
+        # Reuse the previous parse when the file has not changed
+        content_hash = hashlib.blake2b(
+            status_file.content.encode(), digest_size=16
+        ).hexdigest()
+        unchanged = cached is not None and cached.content_hash == content_hash
+    else:
+        logger.warning(f"No REPO_STATUS.md found for {full_name}")
+        return None
+
+    if unchanged:
+        parsed = json.loads(cached.parsed_json)
+        if parsed.get("last_updated"):
+            parsed["last_updated"] = datetime.fromisoformat(parsed["last_updated"])
+    else:
+        parsed = parse_repo_status(status_file.content)
+
+    repo_data = {
+        "name": repo.name,
+        "full_name": full_name,
+        "description": repo.description,
+        "html_url": repo.html_url,
+        "clone_url": repo.clone_url,
+        "language": repo.language,
+        "is_private": int(repo.is_private),
+        "is_archived": int(repo.is_archived),
+        "is_fork": int(repo.is_fork),
+        "stargazers_count": repo.stargazers_count,
+        "forks_count": repo.forks_count,
+        "open_issues_count": repo.open_issues_count,
+        "created_at": repo.created_at,
+        "updated_at": repo.updated_at,
+        "last_reviewed_at": parsed.get("last_updated") or now,
+    }
 
-            # Save repository using db method
-            repo_data = {
-                "name": repo.name,
+    if unchanged:
+        # Only refresh the cache row if GitHub issued a new ETag for the same content.
+        cache_entry = None
+        if status_file and status_file.etag != cached.etag:
+            cache_entry = {
                 "full_name": full_name,
-                "description": repo.description,
-                "html_url": repo.html_url,
-                "clone_url": repo.clone_url,
-                "language": repo.language,
-                "is_private": int(repo.is_private),
-                "is_archived": int(repo.is_archived),
-                "is_fork": int(repo.is_fork),
-                "stargazers_count": repo.stargazers_count,
-                "forks_count": repo.forks_count,
-                "open_issues_count": repo.open_issues_count,
-                "created_at": repo.created_at,
-                "updated_at": repo.updated_at,
-                "last_reviewed_at": parsed.get("last_updated") or datetime.utcnow(),
+                "content_hash": content_hash,
+                "parsed_json": cached.parsed_json,
+                "etag": status_file.etag,
             }
+        return _StatusSync(full_name, parsed, repo_data, None, cache_entry)
+
+    review_result = {
+        "status": parsed.get("status", "completed"),
+        "overall_score": parsed.get("overall_score", 0),
+        "quality_score": parsed.get("code_quality_score", 0),
+        "documentation_score": parsed.get("documentation_score", 0),
+        "structure_score": parsed.get("structure_score", 0),
+        "testing_score": parsed.get("testing_score", 0),
+        "summary": parsed.get("summary", "")[:1000],
+        "stuck_areas": json.dumps(parsed.get("stuck_areas", []), separators=(",", ":")),
+        "next_steps": json.dumps(parsed.get("next_steps", []), separators=(",", ":")),
+    }
+    cache_entry = {
+        "full_name": full_name,
+        "content_hash": content_hash,
+        "parsed_json": json.dumps(parsed, default=str),
+        "etag": status_file.etag,
+    }
+    return _StatusSync(full_name, parsed, repo_data, review_result, cache_entry)
 
-            await db.save_repository(repo_data)
-
-            # Get the repository from database
-            db_repo = await db.get_repository(full_name)
-            if db_repo:
-                # Save review session
-                review_result = {
-                    "status": parsed.get("status", "completed"),
-                    "overall_score": parsed.get("overall_score", 0),
-                    "quality_score": parsed.get("code_quality_score", 0),
-                    "documentation_score": parsed.get("documentation_score", 0),
-                    "structure_score": parsed.get("structure_score", 0),
-                    "testing_score": parsed.get("testing_score", 0),
-                    "summary": parsed.get("summary", "")[:1000],
-                    "stuck_areas": str(parsed.get("stuck_areas", [])),
-                    "next_steps": str(parsed.get("next_steps", [])),
-                }
-
-                await db.save_review_session(db_repo, review_result)
-
-                logger.info(f"  ✓ Synced: {full_name} | Status: {parsed.get('status')} | Score: {parsed.get('overall_score')}")
-                synced += 1
-            else:
-                errors.append(full_name)
 
-        except Exception as e:
-            logger.error(f"  ✗ Error processing {full_name}: {e}")
-            errors.append(full_name)
+async def sync_repo_status():
+    """Sync all REPO_STATUS.md files to the database."""
+    db = Database()
+    github = GitHubClient()
 
-    await db.close()
+    try:
+        await db.connect()
+        synced, errors = await _sync_all(db, github)
+    finally:
+        await github.aclose()
+        await db.close()
 
     logger.info(f"\n{'='*50}")
     logger.info(f"Sync complete!")
@@ -181,5 +269,72 @@ async def sync_repo_status():
     return synced, errors
 
 
+async def _sync_all(db: Database, github: GitHubClient) -> Tuple[int, List[str]]:
+    """Sync every repository's status file; returns the synced count and failed names."""
+    # One "as of" time for every repository in this run.
+    now = datetime.utcnow()
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SYNCS)
+    repos = []
+    tasks = []
+
+    # Start syncing each repository as its listing page arrives, with at most
+    # MAX_CONCURRENT_SYNCS in flight.
+    logger.info("Fetching all repositories from GitHub...")
+    try:
+        async for repo in github.iter_all_repositories():
+            await semaphore.acquire()
+            task = asyncio.create_task(_sync_one(repo, db, github, now))
+            task.add_done_callback(lambda _: semaphore.release())
+            repos.append(repo)
+            tasks.append(task)
+        logger.info(f"Found {len(repos)} repositories")
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        # If listing failed part-way, don't leave the started syncs running unawaited.
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    pending: List[_StatusSync] = []
+    errors = []
+    for repo, result in zip(repos, results):
+        if isinstance(result, Exception):
+            logger.error(f"  ✗ Error processing {repo.full_name}: {result}")
+            errors.append(repo.full_name)
+        elif result is not None:
+            pending.append(result)
+
+    # Write every repository, review session and cache entry in two transactions.
+    synced = 0
+    if pending:
+        try:
+            await db.save_repositories_with_reviews(
+                [item.repo_data for item in pending],
+                {item.full_name: item.review_result for item in pending if item.review_result},
+                completed_at=now,
+            )
+            await db.save_repo_status_cache(
+                [item.cache_entry for item in pending if item.cache_entry], updated_at=now
+            )
+        except Exception as e:
+            logger.error(f"  ✗ Error saving synced repositories: {e}")
+            errors.extend(item.full_name for item in pending)
+        else:
+            for item in pending:
+                if item.review_result is None:
+                    logger.info(f"  = Unchanged: {item.full_name}")
+                else:
+                    logger.info(
+                        f"  ✓ Synced: {item.full_name} | Status: {item.parsed.get('status')} "
+                        f"| Score: {item.parsed.get('overall_score')}"
+                    )
+            synced = len(pending)
+
+    return synced, errors
+
+
 if __name__ == "__main__":
-    asyncio.run(sync_repo_status())
+    # Keep console writes off the sync tasks' path.
+    with queued_logging():
+        asyncio.run(sync_repo_status())
@@ -0,0 +1,35 @@
+"""Shared fixtures for the test suite."""
+
+from datetime import datetime
+
+import pytest
+
+from src.tasks.interpreter import Task, TaskPriority, TaskStatus, TaskType
+
+
+@pytest.fixture
+def make_task():
+    """Build a pending Task; keyword arguments override the defaults."""
+
+    def factory(task_id: str, **overrides) -> Task:
+        fields = dict(
+            id=task_id,
+            title=f"Task {task_id}",
+            description="",
+            task_type=TaskType.FIX_BUG,
+            priority=TaskPriority.MEDIUM,
+            status=TaskStatus.PENDING,
+            repository="owner/repo",
+            target_files=[],
+            command="",
+            parameters={},
+            created_at=datetime.utcnow(),
+            started_at=None,
+            completed_at=None,
+            result=None,
+            error=None,
+        )
+        fields.update(overrides)
+        return Task(**fields)
+
+    return factory
@@ -0,0 +1,115 @@
+"""Tests for the TTL cache and the orchestrator's single-flight fetches."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.core import cache as cache_module
+from src.core.cache import TTLCache
+from src.review.orchestrator import ReviewOrchestrator
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the cache's monotonic clock with one the test advances."""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(maxsize=4, ttl=10)
+    cache.set("a", 1)
+
+    clock.value += 9.9
+    assert cache.get("a") == 1
+    assert "a" in cache
+
+    clock.value += 0.1
+    assert cache.get("a") is None
+    assert cache.get("a", "missing") == "missing"
+    assert len(cache) == 0
+
+
+def test_setting_a_key_again_restarts_its_ttl(clock):
+    cache = TTLCache(maxsize=4, ttl=10)
+    cache.set("a", 1)
+    clock.value += 8
+    cache.set("a", 2)
+    clock.value += 8
+
+    assert cache.get("a") == 2
+
+
+def test_oldest_written_entries_are_evicted_first(clock):
+    cache = TTLCache(maxsize=3, ttl=10)
+    for key in ("a", "b", "c"):
+        cache.set(key, key.upper())
+
+    cache.set("a", "A2")  # rewriting moves "a" to the newest position
+    cache.set("d", "D")
+
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in ("a", "c", "d")] == ["A2", "C", "D"]
+
+    cache.set("e", "E")
+    assert cache.get("c") is None
+    assert len(cache) == 3
+
+
+def test_pop_and_clear(clock):
+    cache = TTLCache(maxsize=3, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.pop("a") == 1
+    assert cache.pop("a", "gone") == "gone"
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.get("b") is None
+
+
+async def test_concurrent_callers_share_a_single_fetch():
+    orchestrator = ReviewOrchestrator(SimpleNamespace(), llm_client=SimpleNamespace())
+    cache = TTLCache(maxsize=8, ttl=60)
+    release = asyncio.Event()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"path": "README.md"}
+
+    callers = [
+        asyncio.create_task(orchestrator._cached_fetch(cache, ("owner/repo", "README.md"), fetch))
+        for _ in range(5)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*callers)
+
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+    assert orchestrator._fetch_locks == {}
+
+    # Later callers are served from the cache without fetching again.
+    assert await orchestrator._cached_fetch(cache, ("owner/repo", "README.md"), fetch) is results[0]
+    assert calls == 1
+
+
+async def test_empty_results_are_not_cached():
+    orchestrator = ReviewOrchestrator(SimpleNamespace(), llm_client=SimpleNamespace())
+    cache = TTLCache(maxsize=8, ttl=60)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return None
+
+    assert await orchestrator._cached_fetch(cache, ("owner/repo", "missing"), fetch) is None
+    assert await orchestrator._cached_fetch(cache, ("owner/repo", "missing"), fetch) is None
+    assert calls == 2
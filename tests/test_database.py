@@ -0,0 +1,75 @@
+"""Tests for the batched repository upsert."""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select, update
+
+from src.core import database as database_module
+from src.core.database import Database, Repository, ReviewSession
+
+
+def repo_data(full_name: str, **overrides):
+    data = {
+        "name": full_name.split("/")[1],
+        "full_name": full_name,
+        "description": "",
+        "html_url": f"https://github.com/{full_name}",
+        "clone_url": f"https://github.com/{full_name}.git",
+        "language": "Python",
+        "is_private": 0,
+        "is_archived": 0,
+        "is_fork": 0,
+        "stargazers_count": 0,
+        "forks_count": 0,
+        "open_issues_count": 0,
+        "created_at": datetime(2024, 1, 1),
+        "updated_at": datetime(2024, 1, 2),
+        "last_reviewed_at": None,
+    }
+    data.update(overrides)
+    return data
+
+
+@pytest.fixture(params=[True, False], ids=["on-conflict-returning", "orm-merge"])
+async def db(request, monkeypatch):
+    monkeypatch.setattr(database_module, "SQLITE_HAS_RETURNING", request.param)
+    db = Database(":memory:")
+    await db.connect()
+    yield db
+    await db.close()
+
+
+async def test_upserting_the_same_full_name_keeps_ids_and_updates_columns(db):
+    first = await db.save_repositories_with_reviews(
+        [repo_data("owner/a", stargazers_count=1), repo_data("owner/b")], {}
+    )
+
+    created = datetime(2020, 5, 17)
+    async with db.session() as session:
+        await session.execute(update(Repository).values(created_at_db=created))
+
+    second = await db.save_repositories_with_reviews(
+        [repo_data("owner/c"), repo_data("owner/a", stargazers_count=42, description="new")],
+        {"owner/a": {"status": "completed", "overall_score": 80}},
+        completed_at=datetime(2024, 6, 1),
+    )
+
+    assert second["owner/a"] == first["owner/a"]
+    assert second["owner/c"] not in first.values()
+
+    async with db.session() as session:
+        repos = {
+            repo.full_name: repo
+            for repo in (await session.execute(select(Repository))).scalars()
+        }
+        sessions = (await session.execute(select(ReviewSession))).scalars().all()
+
+    assert len(repos) == 3
+    assert repos["owner/a"].stargazers_count == 42
+    assert repos["owner/a"].description == "new"
+    assert repos["owner/a"].created_at_db == created
+    assert repos["owner/b"].stargazers_count == 0
+    assert [(s.repository_id, s.completed_at) for s in sessions] == [
+        (first["owner/a"], datetime(2024, 6, 1))
+    ]
@@ -0,0 +1,181 @@
+"""Tests for the task dispatcher's pending heap, retries and shutdown."""
+
+import asyncio
+
+import pytest
+
+from src.tasks import dispatcher as dispatcher_module
+from src.tasks.dispatcher import SHUTDOWN_RANK, QueueType, TaskDispatcher
+from src.tasks.interpreter import TaskPriority, TaskStatus, TaskType
+
+
+async def test_dequeue_orders_by_queue_rank_then_priority_then_fifo(make_task):
+    dispatcher = TaskDispatcher()
+    await dispatcher.enqueue(make_task("background"), QueueType.BACKGROUND)
+    await dispatcher.enqueue(make_task("general-low", priority=TaskPriority.LOW))
+    await dispatcher.enqueue(make_task("general-high-1", priority=TaskPriority.HIGH))
+    await dispatcher.enqueue(make_task("repo"), QueueType.REPO_SPECIFIC, "owner/repo")
+    await dispatcher.enqueue(make_task("general-high-2", priority=TaskPriority.HIGH))
+    await dispatcher.enqueue(make_task("critical", priority=TaskPriority.LOW), QueueType.CRITICAL)
+
+    order = [(await dispatcher.dequeue()).id for _ in range(6)]
+
+    assert order == [
+        "critical",
+        "general-high-1",
+        "general-high-2",
+        "general-low",
+        "repo",
+        "background",
+    ]
+    assert dispatcher.repo_counts == {}
+
+
+async def test_failed_task_is_retried_ahead_of_new_work(make_task):
+    dispatcher = TaskDispatcher()
+    attempts = []
+
+    async def flaky(task):
+        attempts.append(task.id)
+        if len(attempts) == 1:
+            raise RuntimeError("transient")
+        return "ok"
+
+    dispatcher.register_handler(TaskType.FIX_BUG, flaky)
+    task = make_task("flaky")
+    await dispatcher.enqueue(task)
+    assert await dispatcher.dequeue() is task
+    await dispatcher.enqueue(make_task("critical"), QueueType.CRITICAL)
+
+    assert await dispatcher.process_task(task) is False
+    assert task.status == TaskStatus.QUEUED
+    assert task.retries == 1
+
+    # The retry outranks the critical task that is still pending.
+    assert await dispatcher.dequeue() is task
+    assert await dispatcher.process_task(task) is True
+    assert task.status == TaskStatus.COMPLETED
+    assert attempts == ["flaky", "flaky"]
+
+
+async def test_task_failing_every_retry_is_recorded_once(make_task):
+    dispatcher = TaskDispatcher()
+
+    async def broken(task):
+        raise RuntimeError("permanent")
+
+    dispatcher.register_handler(TaskType.FIX_BUG, broken)
+    task = make_task("broken", max_retries=2)
+    await dispatcher.enqueue(task)
+    dispatcher.start_workers(QueueType.GENERAL, num_workers=1)
+
+    assert await dispatcher.wait_for_completion(timeout=1) is True
+    assert task.status == TaskStatus.FAILED
+    assert task.retries == 2
+    assert dispatcher.get_queue_stats(QueueType.GENERAL).failed_tasks == 1
+    await dispatcher.stop_workers()
+
+
+async def test_join_waits_for_retried_tasks(make_task):
+    dispatcher = TaskDispatcher()
+    calls = 0
+
+    async def flaky(task):
+        nonlocal calls
+        calls += 1
+        attempt = calls
+        await asyncio.sleep(0)
+        if attempt == 1:
+            raise RuntimeError("transient")
+
+    dispatcher.register_handler(TaskType.FIX_BUG, flaky)
+    tasks = [make_task(f"t{i}") for i in range(3)]
+    await dispatcher.enqueue_batch(tasks)
+    dispatcher.start_workers(QueueType.GENERAL, num_workers=2)
+
+    await asyncio.wait_for(dispatcher.join(), timeout=1)
+
+    assert calls == 4
+    assert all(task.status == TaskStatus.COMPLETED for task in tasks)
+    await dispatcher.stop_workers()
+
+
+async def test_task_done_rejects_extra_calls():
+    dispatcher = TaskDispatcher()
+
+    with pytest.raises(ValueError):
+        dispatcher.task_done()
+
+
+async def test_stop_workers_leaves_no_sentinels_and_workers_can_restart(make_task):
+    dispatcher = TaskDispatcher()
+    release = asyncio.Event()
+    done = []
+
+    async def slow(task):
+        await release.wait()
+        done.append(task.id)
+
+    dispatcher.register_handler(TaskType.FIX_BUG, slow)
+    await dispatcher.enqueue(make_task("stuck"))
+    workers = dispatcher.start_workers(QueueType.GENERAL, num_workers=3)
+    await asyncio.sleep(0)
+
+    await dispatcher.stop_workers(timeout=0.05)
+
+    assert dispatcher.worker_tasks == {}
+    assert all(dispatcher.workers[w].status in ("stopped", "processing") for w in workers)
+    assert not any(entry[0] == SHUTDOWN_RANK for entry in dispatcher._pending)
+
+    # A fresh generation of workers must not be stopped by leftover sentinels.
+    release.set()
+    await dispatcher.enqueue(make_task("after-restart"))
+    dispatcher.start_workers(QueueType.GENERAL, num_workers=2)
+    assert await dispatcher.wait_for_completion(timeout=1) is True
+    assert done == ["after-restart"]
+    await dispatcher.stop_workers()
+
+
+async def test_idle_workers_stop_promptly():
+    dispatcher = TaskDispatcher()
+    dispatcher.start_workers(QueueType.GENERAL, num_workers=2)
+    await asyncio.sleep(0)
+
+    await asyncio.wait_for(dispatcher.stop_workers(timeout=5), timeout=1)
+
+    assert all(worker.status == "stopped" for worker in dispatcher.get_worker_status())
+    assert dispatcher._pending == []
+
+
+async def test_enqueue_waits_for_room_instead_of_dropping(make_task):
+    dispatcher = TaskDispatcher()
+    dispatcher.max_pending = 2
+    await dispatcher.enqueue(make_task("a"))
+    await dispatcher.enqueue(make_task("b"))
+
+    blocked = asyncio.create_task(dispatcher.enqueue(make_task("c")))
+    await asyncio.sleep(0)
+    assert not blocked.done()
+
+    assert (await dispatcher.dequeue()).id == "a"
+    assert await asyncio.wait_for(blocked, timeout=1) is True
+    assert [task.id for task in dispatcher.get_pending_tasks()] == ["b", "c"]
+
+
+async def test_repository_share_is_capped(make_task, monkeypatch):
+    monkeypatch.setattr(dispatcher_module, "MAX_PENDING_PER_REPO", 2)
+    dispatcher = TaskDispatcher()
+    for name in ("a", "b"):
+        await dispatcher.enqueue(make_task(name), QueueType.REPO_SPECIFIC, "owner/busy")
+
+    blocked = asyncio.create_task(
+        dispatcher.enqueue(make_task("c"), QueueType.REPO_SPECIFIC, "owner/busy")
+    )
+    await dispatcher.enqueue(make_task("other"), QueueType.REPO_SPECIFIC, "owner/quiet")
+    await asyncio.sleep(0)
+    assert not blocked.done()
+    assert dispatcher.repo_counts == {"owner/busy": 2, "owner/quiet": 1}
+
+    await dispatcher.dequeue()
+    await asyncio.wait_for(blocked, timeout=1)
+    assert dispatcher.repo_counts["owner/busy"] == 2
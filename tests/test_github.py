@@ -0,0 +1,49 @@
+"""Tests for the GitHub client's rate limit handling."""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from src.github import client as client_module
+from src.github.client import GitHubClient
+
+
+class FakeGithub:
+    def __init__(self, remaining, reset):
+        self.core = SimpleNamespace(remaining=remaining, limit=5000, reset=reset, used=5000 - remaining)
+
+    def get_rate_limit(self):
+        return SimpleNamespace(core=self.core)
+
+
+@pytest.mark.parametrize(
+    "reset",
+    [
+        datetime.now(timezone.utc) + timedelta(seconds=30),
+        # Older PyGithub versions return naive UTC datetimes.
+        datetime.utcnow() + timedelta(seconds=30),
+    ],
+)
+def test_handle_rate_limit_waits_until_reset_when_quota_is_low(monkeypatch, reset):
+    github = GitHubClient(token="test-token")
+    github.client = FakeGithub(remaining=5, reset=reset)
+    sleeps = []
+    monkeypatch.setattr(client_module.time, "sleep", sleeps.append)
+
+    github._handle_rate_limit()
+
+    assert len(sleeps) == 1
+    assert 29 < sleeps[0] <= 31
+    assert github._rate_limit_info.remaining == 5
+
+
+def test_handle_rate_limit_does_not_wait_with_quota_left(monkeypatch):
+    github = GitHubClient(token="test-token")
+    github.client = FakeGithub(remaining=4000, reset=datetime.now(timezone.utc) + timedelta(hours=1))
+    sleeps = []
+    monkeypatch.setattr(client_module.time, "sleep", sleeps.append)
+
+    github._handle_rate_limit()
+
+    assert sleeps == []
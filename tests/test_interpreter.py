@@ -0,0 +1,102 @@
+"""Tests for natural language task interpretation."""
+
+import pytest
+
+from src.tasks.interpreter import TaskInterpreter, TaskPriority, TaskType
+
+
+@pytest.fixture
+def interpreter():
+    return TaskInterpreter()
+
+
+@pytest.mark.parametrize(
+    "command, task_type",
+    [
+        ("add a test for utils.py", TaskType.ADD_TEST),
+        ("write unit tests for the parser", TaskType.ADD_TEST),
+        ("fix the bug in login", TaskType.FIX_BUG),
+        ("debug the crash", TaskType.FIX_BUG),
+        ("add a new feature for export", TaskType.ADD_FEATURE),
+        ("create a new endpoint for users", TaskType.ADD_FEATURE),
+        ("create readme", TaskType.UPDATE_DOCS),
+        ("update the docs", TaskType.UPDATE_DOCS),
+        ("document the API", TaskType.UPDATE_DOCS),
+        ("refactor the parser", TaskType.REFACTOR),
+        ("clean up the code", TaskType.REFACTOR),
+        ("review the code in repo owner/repo", TaskType.CODE_REVIEW),
+        ("run the tests", TaskType.RUN_TESTS),
+        ("test the project", TaskType.RUN_TESTS),
+        ("deploy to production", TaskType.DEPLOY),
+        ("ship it", TaskType.DEPLOY),
+        ("create a PR to fix typo", TaskType.CREATE_PR),
+        ("open a pull request", TaskType.CREATE_PR),
+        ("merge the PR", TaskType.MERGE_PR),
+        # Generic verbs and words that merely contain a keyword stay general.
+        ("create a branch", TaskType.GENERAL),
+        ("build the docs site", TaskType.GENERAL),
+        ("transfer ownership of the repo", TaskType.GENERAL),
+        ("be specific about errors", TaskType.GENERAL),
+        ("hello there", TaskType.GENERAL),
+    ],
+)
+def test_intent_classification(interpreter, command, task_type):
+    assert interpreter.interpret(command).task_type == task_type
+
+
+@pytest.mark.parametrize(
+    "command, task_type",
+    [
+        ("fix the bug and add a test", TaskType.FIX_BUG),
+        ("add a test after you fix the bug", TaskType.ADD_TEST),
+        ("review the code, then deploy", TaskType.CODE_REVIEW),
+    ],
+)
+def test_leftmost_intent_wins(interpreter, command, task_type):
+    assert interpreter.interpret(command).task_type == task_type
+
+
+@pytest.mark.parametrize(
+    "command, priority",
+    [
+        ("fix the bug urgently", TaskPriority.CRITICAL),
+        ("this is important, refactor the parser", TaskPriority.HIGH),
+        ("refactor the parser when possible", TaskPriority.MEDIUM),
+        ("eventually clean up the code", TaskPriority.LOW),
+        ("refactor the parser", TaskPriority.MEDIUM),
+        # The most urgent indicator wins over a later, lower one.
+        ("eventually, but urgently, refactor", TaskPriority.CRITICAL),
+    ],
+)
+def test_priority_detection(interpreter, command, priority):
+    assert interpreter.interpret(command).priority == priority
+
+
+@pytest.mark.parametrize(
+    "command, confidence",
+    [
+        ("hello there", 0.5),
+        ("fix the bug in login", 0.8),
+        ("add a test and write unit tests", 0.9),
+        ("add a test, write unit tests, then add unit tests for the specs", 0.95),
+    ],
+)
+def test_confidence_grows_with_matches_of_the_detected_intent(interpreter, command, confidence):
+    assert interpreter.interpret(command).confidence == pytest.approx(confidence)
+
+
+def test_batch_interpret_matches_single_interpretation(interpreter):
+    commands = [
+        "create a PR to fix typo",
+        "fix the bug and add a test",
+        "eventually clean up the code",
+        "hello there",
+        "fix the bug and add a test",
+    ]
+
+    batch = interpreter.batch_interpret(commands)
+    single = [TaskInterpreter().interpret(command) for command in commands]
+
+    assert [(p.task_type, p.priority, p.confidence) for p in batch] == [
+        (p.task_type, p.priority, p.confidence) for p in single
+    ]
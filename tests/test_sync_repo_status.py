@@ -0,0 +1,47 @@
+"""Tests for REPO_STATUS.md parsing on malformed and oversized input."""
+
+from sync_repo_status import SECTION_LINE_LIMIT, SUMMARY_SCAN_CHARS, parse_repo_status
+
+
+def test_section_without_closing_heading_is_capped():
+    bullets = "".join(f"- issue {i}\n" for i in range(SECTION_LINE_LIMIT * 20))
+    result = parse_repo_status("## Issues Found\n" + bullets)
+
+    assert len(result["issues"]) == SECTION_LINE_LIMIT
+    assert result["issues"][0] == "issue 0"
+    assert result["issues"][-1] == f"issue {SECTION_LINE_LIMIT - 1}"
+
+
+def test_lines_past_the_section_cap_are_still_scanned():
+    filler = "- more\n" * (SECTION_LINE_LIMIT * 20)
+    content = (
+        "## Stuck Areas\n"
+        + filler
+        + "| **Overall** | `███` 81% |\n"
+        + "Generated: 2024-05-06\n"
+    )
+    result = parse_repo_status(content)
+
+    assert len(result["stuck_areas"]) == SECTION_LINE_LIMIT
+    assert result["overall_score"] == 81
+    assert result["last_updated"].year == 2024
+
+
+def test_very_long_summary_line_is_scanned_only_up_to_the_limit():
+    padding = "x" * (SUMMARY_SCAN_CHARS * 50)
+
+    early = parse_repo_status("## Summary\nverified and updated " + padding + "\n")
+    assert early["status"] == "completed"
+    assert len(early["summary"]) == 500
+
+    late = parse_repo_status("## Summary\n" + padding + " verified and updated\n")
+    assert late["status"] == "unknown"
+    assert len(late["summary"]) == 500
+
+
+def test_summary_with_many_lines_ignores_text_past_the_limit():
+    lines = "".join(f"line {i}\n" for i in range(SECTION_LINE_LIMIT * 20))
+    result = parse_repo_status("## Summary\n" + lines + "needs review\n")
+
+    assert result["status"] == "unknown"
+    assert result["summary"].startswith("line 0\nline 1")
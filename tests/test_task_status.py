@@ -0,0 +1,51 @@
+"""Tests for the task status tracker's indexes."""
+
+import pytest
+
+from src.tasks.interpreter import TaskStatus
+from src.tasks.status import TaskStatusTracker
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    tracker = TaskStatusTracker(str(tmp_path / "task_history.json"))
+    yield tracker
+    tracker.close()
+
+
+def test_update_status_moves_task_between_status_indexes(tracker, make_task):
+    task = make_task("t1")
+    tracker.register_task(task)
+
+    tracker.update_status("t1", TaskStatus.IN_PROGRESS)
+    assert tracker.get_tasks_by_status(TaskStatus.PENDING) == []
+    assert tracker.get_tasks_by_status(TaskStatus.IN_PROGRESS) == [task]
+
+    tracker.update_status("t1", TaskStatus.COMPLETED, result="done")
+    assert tracker.get_tasks_by_status(TaskStatus.IN_PROGRESS) == []
+    assert tracker.get_completed_tasks() == [task]
+
+
+def test_status_assigned_outside_the_tracker_is_reindexed(tracker, make_task):
+    # The dispatcher sets task.status directly on the same Task objects.
+    task = make_task("t1")
+    tracker.register_task(task)
+    task.status = TaskStatus.IN_PROGRESS
+
+    tracker.update_status("t1", TaskStatus.COMPLETED)
+
+    assert tracker.get_tasks_by_status(TaskStatus.PENDING) == []
+    assert tracker.get_tasks_by_status(TaskStatus.IN_PROGRESS) == []
+    assert tracker.get_tasks_by_status(TaskStatus.COMPLETED) == [task]
+    assert tracker.get_metrics().pending_tasks == 0
+
+
+def test_clear_completed_unindexes_tasks_with_directly_assigned_status(tracker, make_task):
+    task = make_task("t1")
+    tracker.register_task(task)
+    task.status = TaskStatus.IN_PROGRESS
+    tracker.update_status("t1", TaskStatus.FAILED, "boom")
+
+    assert tracker.clear_completed() == 1
+    assert tracker.get_tasks_by_status(TaskStatus.PENDING) == []
+    assert tracker.get_tasks_by_repository("owner/repo") == []